@@ -1,9 +1,39 @@
 # algal_blooms_api.py
 
+import asyncio
 import ee
-from datetime import datetime
+import math
+import re
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache, partial
 from typing import List, Union, Dict, Any
 
+from api.cache import analysis_cache
+from api.geometry import geometry_from_json, roi_key
+
+# Worker pool for the async entry point, sized to the high-volume endpoint's concurrency
+_ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=20)
+
+# Result of the single internal entry point: the classification image handle plus a
+# zero-argument callable that fetches (and memoizes) the statistics on demand
+_AlgalRun = namedtuple('_AlgalRun', ['image', 'stats'])
+
+
+@lru_cache(maxsize=128)
+def _water_mask_for(roi_json: str) -> ee.Image:
+    """JRC Global Surface Water mask clipped to the ROI - the asset is static, so memoize per ROI"""
+    # Use occurrence > 0 to identify areas that have been detected as water at least once
+    return ee.Image("JRC/GSW1_4/GlobalSurfaceWater").select('occurrence').gt(0).clip(geometry_from_json(roi_json))
+
+
+@lru_cache(maxsize=1)
+def _pixel_area_ha() -> ee.Image:
+    """Per-pixel area in hectares (built lazily - ee.Image methods exist only after ee.Initialize)"""
+    return ee.Image.pixelArea().divide(10000)
+
+
 class AlgalBloomsAPI:
     """
     Algal Blooms Analysis API for detecting harmful algal blooms using Google Earth Engine.
@@ -11,56 +41,149 @@ class AlgalBloomsAPI:
     Updated to match the working algal_bloom_gee.py implementation.
     """
 
+    _DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+
     def __init__(self):
-        """Initialize Algal Blooms API with detection thresholds"""
+        """Initialize Algal Blooms API with detection thresholds.
+
+        Concurrent Earth Engine requests (parallel probing/tiling) assume the
+        high-volume endpoint configured in main.initialize_earth_engine.
+        """
         self.bloom_threshold_low = 0.05     # NDCI > 0.05 indicates potential bloom
         self.bloom_threshold_moderate = 0.1  # NDCI > 0.1 indicates moderate bloom
         self.bloom_threshold_high = 0.2    # NDCI > 0.2 indicates severe bloom
 
+        # Request-invariant methodology block, formatted once
+        self._methodology = {
+            "approach": "Sentinel-3 OLCI NDCI-based bloom detection",
+            "primary_index": "NDCI (Normalized Difference Chlorophyll Index)",
+            "water_masking": "JRC Global Surface Water occurrence > 0",
+            "thresholds": {
+                "no_bloom": f"NDCI ≤ {self.bloom_threshold_low}",
+                "low_bloom": f"NDCI {self.bloom_threshold_low}-{self.bloom_threshold_moderate}",
+                "moderate_bloom": f"NDCI {self.bloom_threshold_moderate}-{self.bloom_threshold_high}",
+                "severe_bloom": f"NDCI > {self.bloom_threshold_high}"
+            },
+            "data_source": "Sentinel-3 OLCI",
+            "spatial_resolution": "300m",
+            "temporal_composite": "Median"
+        }
+
     def _create_geometry(self, roi_coords: Union[List, dict]):
         """
         Create an Earth Engine geometry from coordinates.
         Supports Polygon, MultiPolygon, Point, LineString.
         """
-        if isinstance(roi_coords, dict) and 'type' in roi_coords and 'coordinates' in roi_coords:
-            geom_type = roi_coords['type'].lower()
-            coords = roi_coords['coordinates']
-            if geom_type == 'polygon':
-                return ee.Geometry.Polygon(coords)
-            elif geom_type == 'multipolygon':
-                return ee.Geometry.MultiPolygon(coords)
-            elif geom_type == 'point':
-                return ee.Geometry.Point(coords)
-            elif geom_type == 'linestring':
-                return ee.Geometry.LineString(coords)
-            else:
-                raise ValueError(f"Unsupported geometry type: {geom_type}")
-        elif isinstance(roi_coords, list):
-            return ee.Geometry.Polygon([roi_coords])
-        else:
-            raise ValueError("Invalid ROI coordinates format")
+        return geometry_from_json(roi_key(roi_coords))
 
     def _validate_dates(self, start_date: str, end_date: str):
         """
-        Validate and parse dates in 'YYYY-MM-DD' format.
+        Validate dates in 'YYYY-MM-DD' format.
+        Zero-padded ISO dates order lexically, so ordering is a plain string comparison.
         Raises ValueError if invalid.
         """
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            if start > end:
-                raise ValueError("start_date must be earlier than end_date")
-            return start_date, end_date
-        except Exception as e:
-            raise ValueError(f"Invalid date format or logic: {str(e)}")
+        for date_str in (start_date, end_date):
+            if not isinstance(date_str, str) or not self._DATE_RE.match(date_str):
+                raise ValueError(f"Invalid date format or logic: {date_str!r} does not match format 'YYYY-MM-DD'")
+            try:
+                date.fromisoformat(date_str)  # Rejects impossible days such as 2023-02-30
+            except ValueError as e:
+                raise ValueError(f"Invalid date format or logic: {str(e)}")
+        if start_date > end_date:
+            raise ValueError("Invalid date format or logic: start_date must be earlier than end_date")
+        return start_date, end_date
 
-    def analyze_algal_bloom(self, roi_coords: Union[List, dict], start_date: str, end_date: str):
+    def analyze_algal_bloom(self, roi_coords: Union[List, dict], start_date: str, end_date: str, shard: bool = False):
         """
         Performs Algal Bloom classification and analysis for a given ROI and date range.
         Uses Sentinel-3 OLCI data with water masking to prevent land misclassification.
         Optimized for memory efficiency while maintaining accuracy.
+        Results are memoized per (ROI, date range); failed analyses are not cached.
+        Set shard=True for very large ROIs to reduce statistics tile by tile in parallel.
+        """
+        return self._run(roi_key(roi_coords), start_date, end_date, shard).stats()
+
+    def _run(self, roi_json: str, start_date: str, end_date: str, shard: bool = False) -> _AlgalRun:
+        """
+        Single internal entry for the detect/create/get endpoints.
+        Building the image makes no round trips; statistics are only fetched when .stats() is called.
+        """
+        return _AlgalRun(
+            image=self._build_algal_layers(roi_json, start_date, end_date)[2],
+            stats=partial(self._run_algal_bloom_analysis, roi_json, start_date, end_date, shard)
+        )
+
+    @analysis_cache(maxsize=128)
+    def _run_algal_bloom_analysis(self, roi_json: str, start_date: str, end_date: str, shard: bool = False):
+        """Run the algal bloom pipeline for a canonicalized ROI key"""
+        roi = geometry_from_json(roi_json)
+
+        image_count, ndci, algal_classes_final = self._build_algal_layers(roi_json, start_date, end_date)
+
+        # --- 5. Statistics Calculation ---
+        print("Calculating statistics...")
+        if shard:
+            results_dict = self._sharded_statistics(roi, ndci, algal_classes_final, image_count)
+        else:
+            # Single round trip: the statistics are only evaluated when the collection is non-empty
+            results_dict = ee.Dictionary(ee.Algorithms.If(
+                image_count.gt(0),
+                self._region_statistics(ndci, algal_classes_final, roi).combine({
+                    'image_count': image_count,
+                    'roi_area_sq_km': roi.area(maxError=100).divide(1e6)
+                }),
+                ee.Dictionary({'image_count': 0})
+            )).getInfo()
+
+        # --- 6. Process and Return Results ---
+        print("Processing results...")
+        if not results_dict.get('image_count'):
+            raise ValueError(f"No Sentinel-3 OLCI images found for the period {start_date} to {end_date}. Try expanding the date range or check if the area contains water bodies.")
+
+        print(f"Found {results_dict['image_count']} Sentinel-3 OLCI images")
+
+        # Process area results
+        area_results_list = results_dict.get('area_by_class', [])
+        class_areas = {item['class']: item['sum'] for item in area_results_list} if area_results_list else {}
+
+        area_no_bloom = class_areas.get(1, 0)
+        area_low_bloom = class_areas.get(2, 0)
+        area_moderate_bloom = class_areas.get(3, 0)
+        area_severe_bloom = class_areas.get(4, 0)
+
+        total_bloom_area_ha = area_low_bloom + area_moderate_bloom + area_severe_bloom
+        mean_ndci_value = results_dict.get('mean_ndci')
+
+        no_bloom_ha, low_bloom_ha, moderate_bloom_ha, severe_bloom_ha, total_bloom_ha = self._round_values(
+            (area_no_bloom, area_low_bloom, area_moderate_bloom, area_severe_bloom, total_bloom_area_ha)
+        )
+
+        final_statistics = {
+            "mean_ndci": round(mean_ndci_value, 4) if isinstance(mean_ndci_value, (int, float)) else None,
+            "images_processed": results_dict.get('image_count', 0),
+            "classification_by_area_ha": {
+                "no_bloom_ha": no_bloom_ha,
+                "low_bloom_ha": low_bloom_ha,
+                "moderate_bloom_ha": moderate_bloom_ha,
+                "severe_bloom_ha": severe_bloom_ha,
+                "total_bloom_area_ha": total_bloom_ha
+            }
+        }
+
+        return {
+            "statistics": final_statistics,
+            "roi_area_sq_km": results_dict.get('roi_area_sq_km', 0),
+            "gee_images": {
+                "algal_bloom_classification": algal_classes_final
+            }
+        }
+
+    def _build_algal_layers(self, roi_json: str, start_date: str, end_date: str):
+        """
+        Build the server-side algal bloom layers without any getInfo() calls.
+        Returns (image_count, water-masked NDCI image, masked classification image).
         """
-        roi = ee.Geometry.Polygon(roi_coords)
+        roi = geometry_from_json(roi_json)
 
         # --- 1. Sentinel-3 OLCI Data Collection ---
         print("Fetching Sentinel-3 OLCI data...")
@@ -69,21 +192,15 @@ class AlgalBloomsAPI:
             .filterDate(start_date, end_date) \
             .select(['Oa08_radiance', 'Oa06_radiance'])
 
-        # Check if we have any images
-        image_count = s3_collection.size().getInfo()
-        if image_count == 0:
-            raise ValueError(f"No Sentinel-3 OLCI images found for the period {start_date} to {end_date}. Try expanding the date range or check if the area contains water bodies.")
-
-        print(f"Found {image_count} Sentinel-3 OLCI images")
+        # Image count stays server-side; it is fetched with the rest of the results below
+        image_count = s3_collection.size()
 
         # Convert to float and get median composite (more stable than mean for large areas)
         s3_image = s3_collection.map(lambda img: img.toFloat()).median().clip(roi)
 
         # --- 2. Water Mask Creation ---
         print("Creating water mask...")
-        water_mask_dataset = ee.Image("JRC/GSW1_4/GlobalSurfaceWater")
-        # Use occurrence > 0 to identify areas that have been detected as water at least once
-        water_mask = water_mask_dataset.select('occurrence').gt(0).clip(roi)
+        water_mask = _water_mask_for(roi_json)
 
         # --- 3. NDCI Calculation ---
         print("Calculating NDCI...")
@@ -102,82 +219,115 @@ class AlgalBloomsAPI:
         # Class 3: Moderate Bloom (0.1 < NDCI ≤ 0.2)
         # Class 4: Severe Bloom (NDCI > 0.2)
         
-        algal_classes = ee.Image(1).rename('algal_class') \
-            .where(ndci.gt(0.05), 2) \
-            .where(ndci.gt(0.1), 3) \
-            .where(ndci.gt(0.2), 4)
+        # One expression over the shared NDCI node, water-masked once; NDCI no-data
+        # pixels fall through to Class 1 as before
+        algal_classes_final = ndci_unmasked.unmask(-1).expression(
+            f"b('NDCI') > {self.bloom_threshold_high} ? 4"
+            f" : b('NDCI') > {self.bloom_threshold_moderate} ? 3"
+            f" : b('NDCI') > {self.bloom_threshold_low} ? 2 : 1"
+        ).updateMask(water_mask).rename('algal_class').clip(roi)
 
-        # Apply water mask to final classification
-        algal_classes_final = algal_classes.updateMask(water_mask).clip(roi)
+        return image_count, ndci, algal_classes_final
 
-        # --- 5. Statistics Calculation ---
-        print("Calculating statistics...")
-        
-        # Calculate mean NDCI for water areas only
-        mean_ndci_result = ndci.reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=roi,
+    def _region_statistics(self, ndci: ee.Image, algal_classes: ee.Image, geometry) -> ee.Dictionary:
+        """Server-side mean NDCI, NDCI pixel count and per-class area (ha) over a geometry"""
+        # Single pass: per-class sums of [NDCI * valid, valid, area]. Every band is unmasked
+        # wherever the class band is, so water pixels without NDCI (class 1) keep their area;
+        # mean NDCI is sum(NDCI)/sum(valid), and the valid count lets tiled results be merged.
+        valid = ndci.mask().rename('valid')
+        stack = ee.Image.cat(
+            ndci.unmask(0).multiply(valid).rename('ndci'),
+            valid,
+            _pixel_area_ha().rename('area'),
+            algal_classes
+        )
+
+        stats = stack.reduceRegion(
+            reducer=ee.Reducer.sum().repeat(3).group(groupField=3, groupName='class'),
+            geometry=geometry,
             scale=300,  # Sentinel-3 OLCI native resolution
             maxPixels=1e12,  # High limit for large areas
             tileScale=4  # Use tiling for memory efficiency
         )
 
-        # Calculate area for each bloom class
-        pixel_area_ha = ee.Image.pixelArea().divide(10000)  # Convert to hectares
-        area_by_class_result = pixel_area_ha.addBands(algal_classes_final).reduceRegion(
-            reducer=ee.Reducer.sum().group(
-                groupField=1,
-                groupName='class',
-            ),
-            geometry=roi,
-            scale=300,
-            maxPixels=1e12,
-            tileScale=4
-        ).get('groups')
+        groups = ee.List(stats.get('groups'))
 
-        # --- 6. Process and Return Results ---
-        print("Processing results...")
-        results_dict = ee.Dictionary({
-            'area_by_class': area_by_class_result,
-            'mean_ndci': mean_ndci_result.get('NDCI'),
-            'image_count': image_count
-        }).getInfo()
+        def group_total(index):
+            return ee.Number(groups.map(
+                lambda group: ee.List(ee.Dictionary(group).get('sum')).get(index)
+            ).reduce(ee.Reducer.sum()))
 
-        # Process area results
-        area_results_list = results_dict.get('area_by_class', [])
-        class_areas = {item['class']: item['sum'] for item in area_results_list} if area_results_list else {}
+        ndci_count = group_total(1)
+        return ee.Dictionary({
+            'area_by_class': groups.map(lambda group: ee.Dictionary({
+                'class': ee.Dictionary(group).get('class'),
+                'sum': ee.List(ee.Dictionary(group).get('sum')).get(2)
+            })),
+            'mean_ndci': ee.Algorithms.If(ndci_count.gt(0), group_total(0).divide(ndci_count), None),
+            'ndci_count': ndci_count
+        })
 
-        area_no_bloom = class_areas.get(1, 0)
-        area_low_bloom = class_areas.get(2, 0)
-        area_moderate_bloom = class_areas.get(3, 0)
-        area_severe_bloom = class_areas.get(4, 0)
+    def _tile_roi(self, roi, bounds: List, n: int = 8) -> List:
+        """Split the ROI bounding box into a grid of about n tiles, each intersected with the ROI"""
+        lons = [point[0] for point in bounds]
+        lats = [point[1] for point in bounds]
+        west, east, south, north = min(lons), max(lons), min(lats), max(lats)
 
-        total_bloom_area_ha = area_low_bloom + area_moderate_bloom + area_severe_bloom
-        mean_ndci_value = results_dict.get('mean_ndci')
+        cols = math.ceil(math.sqrt(n))
+        rows = math.ceil(n / cols)
+        width = (east - west) / cols
+        height = (north - south) / rows
 
-        final_statistics = {
-            "mean_ndci": round(mean_ndci_value, 4) if isinstance(mean_ndci_value, (int, float)) else None,
-            "images_processed": results_dict.get('image_count', 0),
-            "classification_by_area_ha": {
-                "no_bloom_ha": round(area_no_bloom, 2),
-                "low_bloom_ha": round(area_low_bloom, 2),
-                "moderate_bloom_ha": round(area_moderate_bloom, 2),
-                "severe_bloom_ha": round(area_severe_bloom, 2),
-                "total_bloom_area_ha": round(total_bloom_area_ha, 2)
-            }
-        }
+        return [
+            ee.Geometry.Rectangle([
+                west + col * width, south + row * height,
+                west + (col + 1) * width, south + (row + 1) * height
+            ]).intersection(roi, maxError=1)
+            for row in range(rows)
+            for col in range(cols)
+        ]
 
-        return {
-            "statistics": final_statistics,
-            "gee_images": {
-                "algal_bloom_classification": algal_classes_final
-            }
-        }
+    def _sharded_statistics(self, roi, ndci: ee.Image, algal_classes: ee.Image, image_count, n: int = 8) -> Dict[str, Any]:
+        """
+        Reduce statistics per ROI tile in parallel and merge them on the client.
+        Keeps each request well below Earth Engine memory limits for very large ROIs.
+        """
+        results = ee.Dictionary({
+            'image_count': image_count,
+            'roi_area_sq_km': roi.area(maxError=100).divide(1e6),
+            'bounds': roi.bounds().coordinates().get(0)
+        }).getInfo()
+
+        if not results.get('image_count'):
+            return results
+
+        tiles = self._tile_roi(roi, results.pop('bounds'), n)
+        print(f"Reducing statistics over {len(tiles)} ROI tiles...")
+        with ThreadPoolExecutor(max_workers=len(tiles)) as executor:
+            tile_results = list(executor.map(
+                lambda tile: self._region_statistics(ndci, algal_classes, tile).getInfo(), tiles
+            ))
+
+        # Sum class areas and take the pixel-count-weighted mean NDCI
+        class_areas = Counter()
+        ndci_sum, ndci_count = 0.0, 0
+        for tile_result in tile_results:
+            for item in tile_result.get('area_by_class') or []:
+                class_areas[item['class']] += item['sum']
+            count = tile_result.get('ndci_count') or 0
+            if count and tile_result.get('mean_ndci') is not None:
+                ndci_sum += tile_result['mean_ndci'] * count
+                ndci_count += count
+
+        results['area_by_class'] = [{'class': cls, 'sum': area} for cls, area in sorted(class_areas.items())]
+        results['mean_ndci'] = ndci_sum / ndci_count if ndci_count else None
+        return results
 
     def detect_algal_bloom(self, roi_coords: Union[List, dict], 
                         start_date: str = "2021-01-01", 
                         end_date: str = "2023-01-01", 
-                        resolution: int = 300) -> Dict[str, Any]:
+                        resolution: int = 300,
+                        shard: bool = False) -> Dict[str, Any]:
         """
         Main algal bloom detection function.
         
@@ -186,6 +336,7 @@ class AlgalBloomsAPI:
             start_date: Analysis start date (YYYY-MM-DD)
             end_date: Analysis end date (YYYY-MM-DD)
             resolution: Spatial resolution in meters (300m for Sentinel-3 OLCI)
+            shard: Reduce statistics over parallel ROI tiles (for very large ROIs)
             
         Returns:
             Dictionary containing bloom analysis results
@@ -196,14 +347,14 @@ class AlgalBloomsAPI:
             print(f"Starting algal bloom analysis for period: {start_date} to {end_date}")
 
             # Perform the analysis
-            result = self.analyze_algal_bloom(roi_coords, start_date, end_date)
+            result = self.analyze_algal_bloom(roi_coords, start_date, end_date, shard)
             
             # Extract results
             classification_image = result["gee_images"]["algal_bloom_classification"]
             statistics = result["statistics"]
             
             # Convert statistics to API format
-            converted_statistics = self._convert_statistics_format(statistics, roi_coords)
+            converted_statistics = self._convert_statistics_format(statistics, result["roi_area_sq_km"])
             
             print("Algal bloom analysis completed successfully")
             return {
@@ -221,21 +372,36 @@ class AlgalBloomsAPI:
                 "message": "Algal bloom analysis failed. Please check if the area contains water bodies and try a different date range."
             }
 
-    def _convert_statistics_format(self, statistics: Dict[str, Any], roi_coords: Union[List, dict]) -> Dict[str, Any]:
+    async def adetect_algal_bloom(self, roi_coords: Union[List, dict], 
+                                start_date: str = "2021-01-01", 
+                                end_date: str = "2023-01-01", 
+                                resolution: int = 300,
+                                shard: bool = False) -> Dict[str, Any]:
+        """
+        Async algal bloom detection for event-loop callers.
+        Runs detect_algal_bloom on a worker thread so blocking getInfo() calls
+        do not stall other requests. Same arguments and result as detect_algal_bloom.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _ANALYSIS_EXECUTOR,
+            partial(self.detect_algal_bloom, roi_coords, start_date, end_date, resolution, shard)
+        )
+
+    def _convert_statistics_format(self, statistics: Dict[str, Any], roi_area_sq_km: float) -> Dict[str, Any]:
         """Convert statistics from analysis format to API format"""
         try:
-            roi = self._create_geometry(roi_coords)
-            roi_area_sq_km = roi.area(maxError=100).divide(1e6).getInfo()
-            
             mean_ndci = statistics.get("mean_ndci")
             classification_by_area = statistics.get("classification_by_area_ha", {})
             images_processed = statistics.get("images_processed", 0)
             
+            has_ndci = isinstance(mean_ndci, (int, float))
+            
             # Determine bloom detection and severity
             bloom_detected = False
             severity_level = "No bloom"
             
-            if isinstance(mean_ndci, (int, float)):
+            if has_ndci:
                 bloom_detected = mean_ndci > self.bloom_threshold_low
                 severity_level = self._classify_severity(mean_ndci)
             
@@ -244,17 +410,19 @@ class AlgalBloomsAPI:
             bloom_extent_sq_km = total_bloom_area_ha / 100  # Convert hectares to km²
             
             # Calculate water quality indicators
-            chl_indicator = "High" if isinstance(mean_ndci, (int, float)) and mean_ndci > 0.15 else \
-                        "Moderate" if isinstance(mean_ndci, (int, float)) and mean_ndci > 0.08 else "Low"
+            chl_indicator = "High" if has_ndci and mean_ndci > 0.15 else \
+                        "Moderate" if has_ndci and mean_ndci > 0.08 else "Low"
             
-            turbidity_level = "High" if isinstance(mean_ndci, (int, float)) and mean_ndci > 0.12 else \
-                            "Moderate" if isinstance(mean_ndci, (int, float)) and mean_ndci > 0.06 else "Low"
+            turbidity_level = "High" if has_ndci and mean_ndci > 0.12 else \
+                            "Moderate" if has_ndci and mean_ndci > 0.06 else "Low"
             
+            roi_area_rounded, bloom_extent_rounded = self._round_values((roi_area_sq_km, bloom_extent_sq_km))
+
             return {
-                "roi_area_sq_km": round(roi_area_sq_km, 2),
+                "roi_area_sq_km": roi_area_rounded,
                 "mean_ndci": mean_ndci,
                 "bloom_detected": bloom_detected,
-                "bloom_extent_sq_km": round(bloom_extent_sq_km, 2),
+                "bloom_extent_sq_km": bloom_extent_rounded,
                 "severity_level": severity_level,
                 "classification_by_area_ha": classification_by_area,
                 "water_quality_indicators": {
@@ -273,6 +441,10 @@ class AlgalBloomsAPI:
             print(f"Statistics conversion error: {e}")
             raise e
 
+    def _round_values(self, values, decimals: int = 2) -> List[float]:
+        """Round a batch of statistics in one place; missing or non-numeric values become 0.0"""
+        return [round(value, decimals) if isinstance(value, (int, float)) else 0.0 for value in values]
+
     def _classify_severity(self, ndci_val: float) -> str:
         """Classify bloom severity based on NDCI value"""
         if ndci_val is None or not isinstance(ndci_val, (int, float)) or ndci_val <= self.bloom_threshold_low:
@@ -299,11 +471,8 @@ class AlgalBloomsAPI:
             Earth Engine Image with algal bloom classification
         """
         try:
-            result = self.detect_algal_bloom(roi_coords, start_date, end_date, resolution)
-            if result["status"] == "success":
-                return result["classification_image"]
-            else:
-                raise ValueError(result.get("error", "Classification failed"))
+            start_date, end_date = self._validate_dates(start_date, end_date)
+            return self._run(roi_key(roi_coords), start_date, end_date).image
                 
         except Exception as e:
             print(f"Algal bloom image creation error: {e}")
@@ -332,20 +501,7 @@ class AlgalBloomsAPI:
             return {
                 "status": "success",
                 "algal_bloom_analysis": result["statistics"],
-                "methodology": {
-                    "approach": "Sentinel-3 OLCI NDCI-based bloom detection",
-                    "primary_index": "NDCI (Normalized Difference Chlorophyll Index)",
-                    "water_masking": "JRC Global Surface Water occurrence > 0",
-                    "thresholds": {
-                        "no_bloom": f"NDCI ≤ {self.bloom_threshold_low}",
-                        "low_bloom": f"NDCI {self.bloom_threshold_low}-{self.bloom_threshold_moderate}",
-                        "moderate_bloom": f"NDCI {self.bloom_threshold_moderate}-{self.bloom_threshold_high}",
-                        "severe_bloom": f"NDCI > {self.bloom_threshold_high}"
-                    },
-                    "data_source": "Sentinel-3 OLCI",
-                    "spatial_resolution": "300m",
-                    "temporal_composite": "Median"
-                }
+                "methodology": self._methodology
             }
             
         except Exception as e:
@@ -0,0 +1,53 @@
+# cache.py - Shared in-process memoization for analysis entry points
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+
+def _shallow_copy(value):
+    """Copy a result dict and its nested dicts so callers can't mutate the cached entry"""
+    if isinstance(value, dict):
+        return {key: dict(item) if isinstance(item, dict) else item for key, item in value.items()}
+    return value
+
+
+def analysis_cache(maxsize: int = 128, ttl_seconds: float = 3600):
+    """
+    Memoize an analysis method on its arguments, excluding self, in one module-level cache.
+
+    Entries are bounded (least recently used evicted first) and expire after ttl_seconds, so a
+    date range ending today is recomputed once newer imagery can exist. Exceptions are not
+    cached. Dict results are returned as shallow copies; instances are never held by the cache.
+    """
+    def decorator(method):
+        entries = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] < ttl_seconds:
+                    entries.move_to_end(key)
+                    return _shallow_copy(entry[1])
+
+            result = method(self, *args, **kwargs)
+
+            with lock:
+                entries[key] = (time.monotonic(), result)
+                entries.move_to_end(key)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return _shallow_copy(result)
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
@@ -1,14 +1,31 @@
 import ee
-from datetime import datetime
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
+from datetime import date
+from functools import partial
 from typing import List, Union, Dict, Any
 
+from api.cache import analysis_cache
+from api.geometry import geometry_from_json, roi_key
+
+# Result of the single internal entry point: the classification image handle plus a
+# zero-argument callable that fetches (and memoizes) the statistics on demand
+_ForestRun = namedtuple('_ForestRun', ['image', 'stats'])
+
 class ForestAPI:
     """
     Simplified Forest Analysis API - No Fallbacks, Real Satellite Data Only
     """
 
+    _DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+
     def __init__(self):
-        """Initialize Forest API with classification thresholds"""
+        """Initialize Forest API with classification thresholds.
+
+        Concurrent Earth Engine requests (parallel probing/tiling) assume the
+        high-volume endpoint configured in main.initialize_earth_engine.
+        """
         self.dense_forest_threshold = 0.6    # NDVI > 0.6
         self.moderate_forest_threshold = 0.3  # NDVI 0.3-0.6
         
@@ -17,90 +34,120 @@ class ForestAPI:
             {
                 'name': 'Sentinel-2 SR Harmonized',
                 'collection': 'COPERNICUS/S2_SR_HARMONIZED',
-                'bands': ['B2', 'B3', 'B4', 'B8', 'B11'],
+                'bands': ['B4', 'B8', 'B11', 'QA60'],  # QA60 feeds cloud masking
                 'cloud_threshold': [10, 20, 30, 50]
             },
             {
                 'name': 'Landsat 8 Surface Reflectance',
                 'collection': 'LANDSAT/LC08/C02/T1_L2',
-                'bands': ['SR_B2', 'SR_B3', 'SR_B4', 'SR_B5', 'SR_B6'],
+                'bands': ['SR_B4', 'SR_B5', 'SR_B6'],
                 'cloud_threshold': [20, 30, 50]
             }
         ]
 
+        # Request-invariant methodology block, formatted once
+        self._methodology = {
+            "approach": "Multi-satellite NDVI classification",
+            "thresholds": {
+                "dense_forest": f"NDVI > {self.dense_forest_threshold}",
+                "moderate_forest": f"NDVI {self.moderate_forest_threshold}-{self.dense_forest_threshold}",
+                "sparse_forest": f"NDVI < {self.moderate_forest_threshold}"
+            },
+            "data_sources": [source['name'] for source in self.satellite_sources]
+        }
+
     def _create_geometry(self, roi_coords: Union[List, dict]):
         """Create Earth Engine geometry from coordinates."""
-        if isinstance(roi_coords, list):
-            return ee.Geometry.Polygon([roi_coords])
-        else:
-            raise ValueError("Invalid ROI coordinates format")
+        return geometry_from_json(roi_key(roi_coords))
 
     def _validate_dates(self, start_date: str, end_date: str):
-        """Validate dates."""
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            if start > end:
-                raise ValueError("start_date must be earlier than end_date")
-            return start_date, end_date
-        except Exception as e:
-            raise ValueError(f"Invalid date format: {str(e)}")
+        """Validate dates (YYYY-MM-DD) with a precompiled pattern and string comparison."""
+        for date_str in (start_date, end_date):
+            if not isinstance(date_str, str) or not self._DATE_RE.match(date_str):
+                raise ValueError(f"Invalid date format: {date_str!r} does not match format 'YYYY-MM-DD'")
+            try:
+                date.fromisoformat(date_str)  # Rejects impossible days such as 2023-02-30
+            except ValueError as e:
+                raise ValueError(f"Invalid date format: {str(e)}")
+        if start_date > end_date:
+            raise ValueError("Invalid date format: start_date must be earlier than end_date")
+        return start_date, end_date
+
+    def _build_collection(self, source: Dict[str, Any], cloud_threshold: int, roi, start_date: str, end_date: str):
+        """Build the filtered image collection for one source and cloud threshold"""
+        if source['name'] == 'Sentinel-2 SR Harmonized':
+            cloud_property = 'CLOUDY_PIXEL_PERCENTAGE'
+        else:  # Landsat
+            cloud_property = 'CLOUD_COVER'
+
+        return ee.ImageCollection(source['collection']) \
+            .filterBounds(roi) \
+            .filterDate(start_date, end_date) \
+            .filter(ee.Filter.lt(cloud_property, cloud_threshold)) \
+            .select(source['bands'])
+
+    def _probe(self, source: Dict[str, Any], roi, start_date: str, end_date: str):
+        """
+        Pick the tightest cloud threshold with imagery for one source.
+        The thresholds are tested in a server-side ee.Algorithms.If ladder, so this is a single getInfo().
+        Returns the selected threshold, or None if no threshold yields images.
+        """
+        selected = ee.Number(-1)
+        for cloud_threshold in reversed(source['cloud_threshold']):
+            collection = self._build_collection(source, cloud_threshold, roi, start_date, end_date)
+            # Existence check only - the full image count is fetched with the final statistics
+            selected = ee.Algorithms.If(collection.limit(1).size().gt(0), cloud_threshold, selected)
+
+        cloud_threshold = ee.Number(selected).getInfo()
+        return cloud_threshold if cloud_threshold >= 0 else None
 
-    def _get_satellite_data(self, roi, start_date: str, end_date: str):
-        """Get satellite data with multiple source fallback - NO SYNTHETIC DATA"""
+    def _get_satellite_data(self, roi, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Get processed imagery for every source with data, in priority order - NO SYNTHETIC DATA"""
         
-        for source in self.satellite_sources:
-            print(f"🔍 Trying {source['name']}...")
-            
-            try:
-                # Try different cloud thresholds
-                for cloud_threshold in source['cloud_threshold']:
-                    print(f"  - Cloud threshold: {cloud_threshold}%")
-                    
-                    if source['name'] == 'Sentinel-2 SR Harmonized':
-                        collection = ee.ImageCollection(source['collection']) \
-                            .filterBounds(roi) \
-                            .filterDate(start_date, end_date) \
-                            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', cloud_threshold)) \
-                            .select(source['bands'])
-                    else:  # Landsat
-                        collection = ee.ImageCollection(source['collection']) \
-                            .filterBounds(roi) \
-                            .filterDate(start_date, end_date) \
-                            .filter(ee.Filter.lt('CLOUD_COVER', cloud_threshold)) \
-                            .select(source['bands'])
-                    
-                    # Check if we have data
-                    image_count = collection.size().getInfo()
-                    print(f"    Found {image_count} images")
-                    
-                    if image_count > 0:
-                        # Process the imagery
-                        if source['name'] == 'Sentinel-2 SR Harmonized':
-                            image = self._process_sentinel2(collection, roi)
-                        else:  # Landsat
-                            image = self._process_landsat(collection, roi)
-                        
-                        # Verify we have valid data
-                        if self._validate_image_data(image, roi):
-                            print(f"✅ Successfully obtained data from {source['name']}")
-                            return {
-                                'image': image,
-                                'source': source['name'],
-                                'image_count': image_count
-                            }
-                        else:
-                            print(f"    No valid data after processing")
-                            continue
-                
+        # Probe every source concurrently - one threshold ladder round trip per source
+        print(f"🔍 Probing {len(self.satellite_sources)} satellite sources...")
+        probes = {}
+        with ThreadPoolExecutor(max_workers=len(self.satellite_sources)) as executor:
+            futures = {
+                executor.submit(self._probe, source, roi, start_date, end_date): index
+                for index, source in enumerate(self.satellite_sources)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    probes[index] = future.result()
+                except Exception as e:
+                    print(f"Error with {self.satellite_sources[index]['name']}: {e}")
+
+        # Every source with imagery, in priority order - pixel validity is checked by the caller's
+        # statistics fetch, so no separate validation round trip is needed here
+        candidates = []
+        for index, source in enumerate(self.satellite_sources):
+            cloud_threshold = probes.get(index)
+            if cloud_threshold is None:
                 print(f"No usable data from {source['name']}")
-                
-            except Exception as e:
-                print(f"Error with {source['name']}: {e}")
                 continue
-        
-        # If all satellite sources fail, raise error - NO FALLBACKS
-        raise Exception("No satellite data available for the selected area and time period. Please try different dates or check if the area has forest coverage.")
+
+            print(f"  - {source['name']}: images found at cloud threshold {cloud_threshold}%")
+            collection = self._build_collection(source, cloud_threshold, roi, start_date, end_date)
+
+            # Process the imagery
+            if source['name'] == 'Sentinel-2 SR Harmonized':
+                image = self._process_sentinel2(collection, roi)
+            else:  # Landsat
+                image = self._process_landsat(collection, roi)
+
+            candidates.append({
+                'image': image,
+                'source': source['name'],
+                'collection': collection
+            })
+
+        if not candidates:
+            # If all satellite sources fail, raise error - NO FALLBACKS
+            raise Exception("No satellite data available for the selected area and time period. Please try different dates or check if the area has forest coverage.")
+
+        return candidates
 
     def _process_sentinel2(self, collection, roi):
         """Process Sentinel-2 data"""
@@ -109,7 +156,8 @@ class ForestAPI:
             cloud_bit_mask = 1 << 10
             cirrus_bit_mask = 1 << 11
             mask = qa.bitwiseAnd(cloud_bit_mask).eq(0).And(qa.bitwiseAnd(cirrus_bit_mask).eq(0))
-            return image.updateMask(mask).divide(10000)
+            # Keep only the NDVI/NBR inputs so median() reduces three bands
+            return image.updateMask(mask).select(['B4', 'B8', 'B11']).divide(10000)
         
         # Apply cloud masking and get median
         image = collection.map(mask_clouds).median().clip(roi)
@@ -123,8 +171,8 @@ class ForestAPI:
     def _process_landsat(self, collection, roi):
         """Process Landsat data"""
         def apply_scale_factors(image):
-            optical_bands = image.select('SR_B.').multiply(0.0000275).add(-0.2)
-            return image.addBands(optical_bands, None, True)
+            # Only the NDVI/NBR inputs are scaled and composited
+            return image.select(['SR_B4', 'SR_B5', 'SR_B6']).multiply(0.0000275).add(-0.2)
         
         # Apply scaling and get median
         image = collection.map(apply_scale_factors).median().clip(roi)
@@ -135,22 +183,15 @@ class ForestAPI:
         
         return image.addBands([ndvi, nbr])
 
-    def _validate_image_data(self, image, roi):
-        """Validate that image has actual data"""
-        try:
-            # Check if NDVI has valid values
-            ndvi_stats = image.select('NDVI').reduceRegion(
-                reducer=ee.Reducer.count(),
-                geometry=roi,
-                scale=100,
-                maxPixels=1e9
-            )
-            
-            pixel_count = ndvi_stats.get('NDVI').getInfo()
-            return pixel_count is not None and pixel_count > 0
-            
-        except Exception:
-            return False
+    def _build_forest_classification_image(self, image, roi) -> ee.Image:
+        """Build the NDVI threshold classification image (server-side only, no getInfo)"""
+        ndvi = image.select('NDVI')
+
+        # Single expression node; masked NDVI pixels fall through to Class 1 as before
+        return ndvi.unmask(-1).expression(
+            f"b(0) > {self.dense_forest_threshold} ? 3"
+            f" : b(0) >= {self.moderate_forest_threshold} ? 2 : 1"
+        ).rename('forest_class').clip(roi)
 
     def classify_forest_and_estimate_biomass(self, roi_coords: Union[List, dict], 
                                            start_date: str = "2021-01-01", 
@@ -160,104 +201,166 @@ class ForestAPI:
         Forest classification and biomass estimation - REAL DATA ONLY
         """
         try:
-            # Validate inputs
-            start_date, end_date = self._validate_dates(start_date, end_date)
-            roi = self._create_geometry(roi_coords)
+            return self._run(roi_key(roi_coords), start_date, end_date, resolution).stats()
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "message": "Forest analysis failed - no satellite data available for the selected area and time period"
+            }
 
-            # Calculate ROI area
-            area_m2 = roi.area()
-            area_ha = area_m2.divide(10000)
-            area_km2 = area_m2.divide(1e6)
-            area_km2_val = area_km2.getInfo()
+    def _run(self, roi_json: str, start_date: str, end_date: str, resolution: int = 10) -> _ForestRun:
+        """
+        Single internal entry for the classify/create/get endpoints.
+        The image is picked server-side with the statistics' validity test, so a cloud-covered
+        top-priority source falls back exactly as the statistics do - without fetching them.
+        """
+        start_date, end_date = self._validate_dates(start_date, end_date)
+        roi = geometry_from_json(roi_json)
+        candidates = self._satellite_candidates(roi_json, start_date, end_date)
+        return _ForestRun(
+            image=self._build_forest_classification_image(self._select_image(candidates, roi, resolution), roi),
+            stats=partial(self._run_forest_analysis, roi_json, start_date, end_date, resolution)
+        )
 
-            print(f"🌲 Analyzing forest for {area_km2_val:.2f} km² area...")
+    def _select_image(self, candidates: List[Dict[str, Any]], roi, resolution: int) -> ee.Image:
+        """
+        First candidate image with valid NDVI over the ROI, chosen on the server (no round trip).
+        Same criterion as _run_forest_analysis: an NDVI mean exists at the analysis scale.
+        """
+        image = candidates[-1]['image']
+        for candidate in reversed(candidates[:-1]):
+            ndvi_pixels = candidate['image'].select('NDVI').reduceRegion(
+                reducer=ee.Reducer.count(),
+                geometry=roi,
+                scale=resolution,
+                maxPixels=1e11,
+                tileScale=4
+            ).get('NDVI')
+            image = ee.Image(ee.Algorithms.If(ee.Number(ndvi_pixels).gt(0), candidate['image'], image))
+        return image
 
-            # Get satellite data - will raise exception if no data available
-            satellite_result = self._get_satellite_data(roi, start_date, end_date)
-            image = satellite_result['image']
-            data_source = satellite_result['source']
+    @analysis_cache(maxsize=128)
+    def _satellite_candidates(self, roi_json: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Memoized source probing so the image and statistics paths share one set of probes"""
+        return self._get_satellite_data(geometry_from_json(roi_json), start_date, end_date)
+
+    @analysis_cache(maxsize=128)
+    def _run_forest_analysis(self, roi_json: str, start_date: str, end_date: str, resolution: int) -> Dict[str, Any]:
+        """Run the forest analysis pipeline - memoized on (roi, dates, resolution), failures are not cached"""
+        # Validate inputs
+        start_date, end_date = self._validate_dates(start_date, end_date)
+        roi = geometry_from_json(roi_json)
+
+        # Calculate ROI area
+        area_m2 = roi.area()
+        area_ha = area_m2.divide(10000)
+        area_km2 = area_m2.divide(1e6)
+
+        print("🌲 Analyzing forest...")
 
-            # Extract NDVI for classification
-            ndvi = image.select('NDVI')
+        # Get satellite data - will raise exception if no data available
+        candidates = self._satellite_candidates(roi_json, start_date, end_date)
 
-            # Create forest classification image
-            forest_classification = ee.Image(1) \
-                .where(ndvi.gte(self.moderate_forest_threshold).And(ndvi.lte(self.dense_forest_threshold)), 2) \
-                .where(ndvi.gt(self.dense_forest_threshold), 3) \
-                .rename('forest_class').clip(roi)
+        # The first source whose statistics contain NDVI wins; the fetch doubles as data validation
+        for satellite_result in candidates:
+            image = satellite_result['image']
 
             # Calculate statistics
-            stats = image.reduceRegion(
+            stats = image.select(['NDVI', 'NBR']).reduceRegion(
                 reducer=ee.Reducer.mean(),
                 geometry=roi,
                 scale=resolution,
-                maxPixels=1e11
+                maxPixels=1e11,
+                tileScale=4
             )
 
-            mean_ndvi = stats.get('NDVI').getInfo()
-            mean_nbr = stats.get('NBR').getInfo()
-            area_ha_val = area_ha.getInfo()
+            # Fetch areas and means in a single round trip. Earth Engine errors (quota, memory,
+            # bad geometry) propagate; only a missing NDVI mean means "no data, try the next source"
+            results = ee.Dictionary({
+                'area_ha': area_ha,
+                'area_km2': area_km2,
+                'mean_ndvi': stats.get('NDVI'),
+                'mean_nbr': stats.get('NBR'),
+                'image_count': satellite_result['collection'].size()
+            }).getInfo()
 
-            if mean_ndvi is None:
-                raise Exception("No valid NDVI data found in the selected area")
+            if results.get('mean_ndvi') is not None:
+                print(f"✅ Successfully obtained data from {satellite_result['source']}")
+                break
+            print(f"    No valid data from {satellite_result['source']}")
+        else:
+            raise Exception("No valid NDVI data found in the selected area")
 
-            # Forest classification based on NDVI
-            forest_class = self._classify_forest(mean_ndvi)
+        data_source = satellite_result['source']
 
-            # Biomass estimation based on NDVI
-            above_biomass = self._estimate_biomass(mean_ndvi)
-            below_biomass = round(0.2 * above_biomass, 2)
-            total_biomass_per_ha = round(above_biomass + below_biomass, 2)
-            total_biomass = round(total_biomass_per_ha * area_ha_val, 2)
+        # Create forest classification image
+        forest_classification = self._build_forest_classification_image(image, roi)
 
-            # Carbon stock estimation
-            carbon_conversion_factor = 0.47
-            average_carbon_per_ha = round(total_biomass_per_ha * carbon_conversion_factor, 2)
-            total_carbon_stock = round(total_biomass * carbon_conversion_factor, 2)
+        mean_ndvi = results.get('mean_ndvi')
+        mean_nbr = results.get('mean_nbr')
+        area_ha_val = results['area_ha']
+        area_km2_val = results['area_km2']
 
-            # CO₂ equivalent estimation
-            co2_eq = round(total_carbon_stock * 3.67, 2)
+        print(f"🌲 Forest area analyzed: {area_km2_val:.2f} km²")
 
-            print(f"Forest analysis completed using {data_source}")
+        # Forest classification based on NDVI
+        forest_class = self._classify_forest(mean_ndvi)
 
-            return {
-                "status": "success",
-                "classification_image": forest_classification,
-                "statistics": {
-                    "roi_area_ha": round(area_ha_val, 2),
-                    "roi_area_km2": round(area_km2_val, 2),
-                    "mean_NDVI": round(mean_ndvi, 4),
-                    "mean_NBR": round(mean_nbr or 0, 4),
-                    "forest_classification": forest_class,
-                    "data_source": data_source,
-                    "images_processed": satellite_result['image_count'],
-                    "biomass_partitioning": {
-                        "aboveground_biomass_Mg_per_ha": round(above_biomass, 2),
-                        "belowground_biomass_Mg_per_ha": below_biomass,
-                        "total_biomass_Mg_per_ha": total_biomass_per_ha
-                    },
-                    "biomass_estimation": {
-                        "average_biomass_Mg_per_ha": total_biomass_per_ha,
-                        "total_biomass_Mg": total_biomass
-                    },
-                    "carbon_stock_estimation": {
-                        "conversion_factor": carbon_conversion_factor,
-                        "average_carbon_stock_MgC_per_ha": average_carbon_per_ha,
-                        "total_carbon_stock_MgC": total_carbon_stock
-                    },
-                    "co2_equivalent_estimation": {
-                        "conversion_factor": 3.67,
-                        "total_co2_eq_Mg": co2_eq
-                    }
+        # Biomass estimation based on NDVI
+        above_biomass = self._estimate_biomass(mean_ndvi)
+        below_biomass = round(0.2 * above_biomass, 2)
+        total_biomass_per_ha = round(above_biomass + below_biomass, 2)
+        total_biomass = round(total_biomass_per_ha * area_ha_val, 2)
+
+        # Carbon stock estimation
+        carbon_conversion_factor = 0.47
+        average_carbon_per_ha = round(total_biomass_per_ha * carbon_conversion_factor, 2)
+        total_carbon_stock = round(total_biomass * carbon_conversion_factor, 2)
+
+        # CO₂ equivalent estimation
+        co2_eq = round(total_carbon_stock * 3.67, 2)
+
+        roi_area_ha, roi_area_km2, above_biomass_rounded = self._round_values((area_ha_val, area_km2_val, above_biomass))
+        mean_ndvi_rounded, mean_nbr_rounded = self._round_values((mean_ndvi, mean_nbr), 4)
+
+        print(f"Forest analysis completed using {data_source}")
+
+        return {
+            "status": "success",
+            "classification_image": forest_classification,
+            "statistics": {
+                "roi_area_ha": roi_area_ha,
+                "roi_area_km2": roi_area_km2,
+                "mean_NDVI": mean_ndvi_rounded,
+                "mean_NBR": mean_nbr_rounded,
+                "forest_classification": forest_class,
+                "data_source": data_source,
+                "images_processed": results['image_count'],
+                "biomass_partitioning": {
+                    "aboveground_biomass_Mg_per_ha": above_biomass_rounded,
+                    "belowground_biomass_Mg_per_ha": below_biomass,
+                    "total_biomass_Mg_per_ha": total_biomass_per_ha
+                },
+                "biomass_estimation": {
+                    "average_biomass_Mg_per_ha": total_biomass_per_ha,
+                    "total_biomass_Mg": total_biomass
+                },
+                "carbon_stock_estimation": {
+                    "conversion_factor": carbon_conversion_factor,
+                    "average_carbon_stock_MgC_per_ha": average_carbon_per_ha,
+                    "total_carbon_stock_MgC": total_carbon_stock
+                },
+                "co2_equivalent_estimation": {
+                    "conversion_factor": 3.67,
+                    "total_co2_eq_Mg": co2_eq
                 }
             }
+        }
 
-        except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "message": "Forest analysis failed - no satellite data available for the selected area and time period"
-            }
+    def _round_values(self, values, decimals: int = 2) -> List[float]:
+        """Round a batch of statistics in one place; missing or non-numeric values become 0.0"""
+        return [round(value, decimals) if isinstance(value, (int, float)) else 0.0 for value in values]
 
     def _classify_forest(self, ndvi_val: float) -> str:
         """Classify forest type based on NDVI value"""
@@ -281,11 +384,8 @@ class ForestAPI:
                                          start_date: str, end_date: str, resolution: int = 10) -> ee.Image:
         """Create forest classification image for visualization."""
         try:
-            result = self.classify_forest_and_estimate_biomass(roi_coords, start_date, end_date, resolution)
-            if result["status"] == "success":
-                return result["classification_image"]
-            else:
-                raise Exception(result.get("error", "Classification failed"))
+            # Only source probing is needed - the statistics reductions are skipped
+            return self._run(roi_key(roi_coords), start_date, end_date, resolution).image
         except Exception as e:
             raise Exception(f"Forest classification failed: {str(e)}")
 
@@ -301,16 +401,7 @@ class ForestAPI:
             return {
                 "status": "success",
                 "forest_analysis": result["statistics"],
-                "methodology": {
-                    "approach": "Multi-satellite NDVI classification",
-                    "thresholds": {
-                        "dense_forest": f"NDVI > {self.dense_forest_threshold}",
-                        "moderate_forest": f"NDVI {self.moderate_forest_threshold}-{self.dense_forest_threshold}",
-                        "sparse_forest": f"NDVI < {self.moderate_forest_threshold}"
-                    },
-                    "data_sources": [source['name'] for source in self.satellite_sources],
-                    "spatial_resolution": f"{resolution}m"
-                }
+                "methodology": {**self._methodology, "spatial_resolution": f"{resolution}m"}
             }
             
         except Exception as e:
@@ -0,0 +1,38 @@
+# geometry.py - Shared, memoized Earth Engine geometry construction
+
+import ee
+import json
+from functools import lru_cache
+from typing import List, Union
+
+
+def roi_key(roi_coords: Union[List, dict]) -> str:
+    """Canonical JSON key for ROI coordinates (stable across dict key order)."""
+    return json.dumps(roi_coords, sort_keys=True)
+
+
+@lru_cache(maxsize=256)
+def geometry_from_json(roi_json: str):
+    """
+    Create an Earth Engine geometry from canonical ROI JSON.
+    Supports Polygon, MultiPolygon, Point, LineString dicts and plain coordinate rings.
+    Memoized so repeated requests for the same ROI share one ee.Geometry object.
+    """
+    roi_coords = json.loads(roi_json)
+    if isinstance(roi_coords, dict) and 'type' in roi_coords and 'coordinates' in roi_coords:
+        geom_type = roi_coords['type'].lower()
+        coords = roi_coords['coordinates']
+        if geom_type == 'polygon':
+            return ee.Geometry.Polygon(coords)
+        elif geom_type == 'multipolygon':
+            return ee.Geometry.MultiPolygon(coords)
+        elif geom_type == 'point':
+            return ee.Geometry.Point(coords)
+        elif geom_type == 'linestring':
+            return ee.Geometry.LineString(coords)
+        else:
+            raise ValueError(f"Unsupported geometry type: {geom_type}")
+    elif isinstance(roi_coords, list):
+        return ee.Geometry.Polygon([roi_coords])
+    else:
+        raise ValueError("Invalid ROI coordinates format")
@@ -1,8 +1,21 @@
 # grassland_api.py - Fixed version with proper statistics formatting
 
 import ee
-from datetime import datetime
-from typing import List, Union, Dict, Any
+import logging
+import math
+import numpy as np
+import os
+import re
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import List, Tuple, Union, Dict, Any
+
+from api.cache import analysis_cache
+from api.geometry import geometry_from_json, roi_key
+from api.retry import call_with_retry
+
+logger = logging.getLogger(__name__)
 
 class GrasslandAPI:
     """
@@ -10,8 +23,15 @@ class GrasslandAPI:
     Uses rule-based classification based on NDVI thresholds to distinguish grassland and savanna.
     """
 
+    _DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
     def __init__(self):
-        """Initialize Grassland API with classification thresholds"""
+        """Initialize Grassland API with classification thresholds.
+
+        Earth Engine is initialized against the high-volume endpoint in
+        main.initialize_earth_engine; analyze_grassland holds no per-call state
+        and is safe to run from a thread pool of ~25 workers against it.
+        """
         self.grassland_threshold_min = 0.2   # NDVI >= 0.2
         self.grassland_threshold_max = 0.45  # NDVI < 0.45
         self.savanna_threshold_min = 0.45    # NDVI >= 0.45
@@ -21,158 +41,159 @@ class GrasslandAPI:
         self.biomass_grassland = 5.0
         self.biomass_savanna = 12.0
 
+        # Thresholds inlined as literals: an expression variable map would promote each
+        # float to its own Image.constant node in every serialized graph
+        self._classification_expression = (
+            f"(b('NDVI') >= {self.grassland_threshold_min} && b('NDVI') < {self.grassland_threshold_max}) ? 1"
+            f" : (b('NDVI') >= {self.savanna_threshold_min} && b('NDVI') <= {self.savanna_threshold_max}) ? 2"
+            f" : (b('NDVI') > {self.savanna_threshold_max}) ? 3 : 0"
+        )
+
+        # Per-step pixel-count getInfo() checks; off by default since the fused
+        # statistics fetch in analyze_grassland already validates the result
+        self.debug_checks = False
+
     def _create_geometry(self, roi_coords: Union[List, dict]):
-        """Create an Earth Engine geometry from coordinates."""
-        if isinstance(roi_coords, dict) and 'type' in roi_coords and 'coordinates' in roi_coords:
-            geom_type = roi_coords['type'].lower()
-            coords = roi_coords['coordinates']
-            if geom_type == 'polygon':
-                return ee.Geometry.Polygon(coords)
-            elif geom_type == 'multipolygon':
-                return ee.Geometry.MultiPolygon(coords)
-            elif geom_type == 'point':
-                return ee.Geometry.Point(coords)
-            elif geom_type == 'linestring':
-                return ee.Geometry.LineString(coords)
-            else:
-                raise ValueError(f"Unsupported geometry type: {geom_type}")
-        elif isinstance(roi_coords, list):
-            return ee.Geometry.Polygon([roi_coords])
-        else:
-            raise ValueError("Invalid ROI coordinates format")
+        """Create an Earth Engine geometry from coordinates (memoized on the canonical ROI JSON)."""
+        return geometry_from_json(roi_key(roi_coords))
 
     def _validate_dates(self, start_date: str, end_date: str):
-        """Validate and parse dates in 'YYYY-MM-DD' format."""
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            if start > end:
-                raise ValueError("start_date must be earlier than end_date")
-            return start_date, end_date
-        except Exception as e:
-            raise ValueError(f"Invalid date format or logic: {str(e)}")
+        """
+        Validate dates in 'YYYY-MM-DD' format.
+        Zero-padded ISO dates order lexically, so ordering is a plain string comparison.
+        """
+        for date_str in (start_date, end_date):
+            if not isinstance(date_str, str) or not self._DATE_RE.match(date_str):
+                raise ValueError(f"Invalid date format or logic: {date_str!r} does not match format 'YYYY-MM-DD'")
+            try:
+                date.fromisoformat(date_str)
+            except ValueError as e:
+                raise ValueError(f"Invalid date format or logic: {str(e)}")
+        if start_date > end_date:
+            raise ValueError("Invalid date format or logic: start_date must be earlier than end_date")
+        return start_date, end_date
+
+    def _mask_s2_clouds(self, image: ee.Image) -> ee.Image:
+        """Mask cloud shadow, medium/high cloud, cirrus and snow (SCL 3, 8-11) plus a 500 m buffer"""
+        scl = image.select('SCL')
+        cloudy = scl.eq(3).Or(scl.gte(8).And(scl.lte(11)))
+        cloudy_buffered = cloudy.focalMax(radius=500, units='meters')
+        return image.select(['B4', 'B8']).updateMask(cloudy_buffered.Not())
+
+    def _mask_landsat_clouds(self, image: ee.Image) -> ee.Image:
+        """Mask dilated cloud, cirrus, cloud, cloud shadow and snow (QA_PIXEL bits 1-5)"""
+        qa = image.select('QA_PIXEL')
+        return image.select(['SR_B4', 'SR_B5']).updateMask(qa.bitwiseAnd(0b111110).eq(0))
+
+    def _scene_ndvi(self, image: ee.Image) -> ee.Image:
+        """Per-scene NDVI from harmonized NIR/RED bands"""
+        return image.normalizedDifference(['NIR', 'RED']).rename('NDVI')
 
     def get_ndvi_image(self, roi, start_date: str, end_date: str) -> ee.Image:
         """
-        Generates a robust NDVI image with multiple data source attempts.
+        Generates a robust NDVI image from Sentinel-2 and Landsat 8 together.
+        Clouds are masked per pixel in both sources (S2 SCL, Landsat QA_PIXEL), both
+        are harmonized to NIR/RED and merged into one collection, and the composite keeps each pixel's
+        highest-NDVI observation (qualityMosaic). Source choice is thereby made per
+        pixel on the server, with no client-side fallback round trip.
         """
-        print(f"🔄 Fetching Sentinel-2 data for grassland analysis...")
-        
-        # Try different cloud cover thresholds
-        cloud_thresholds = [20, 40, 60, 80]
-        
-        for threshold in cloud_thresholds:
-            try:
-                print(f"  Trying cloud threshold: {threshold}%")
-                collection = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
-                    .filterBounds(roi) \
-                    .filterDate(start_date, end_date) \
-                    .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', threshold))
-                
-                # Check if we have any images
-                image_count = collection.size().getInfo()
-                print(f"  Found {image_count} images with <{threshold}% cloud cover")
-                
-                if image_count > 0:
-                    # Get median composite
-                    s2_image = collection.median()
-                    
-                    # Calculate NDVI
-                    ndvi = s2_image.normalizedDifference(['B8', 'B4']).rename('NDVI')
-                    
-                    # Clip to ROI
-                    ndvi_clipped = ndvi.clip(roi)
-                    
-                    # Verify the image has valid data
-                    ndvi_info = ndvi_clipped.reduceRegion(
-                        reducer=ee.Reducer.count(),
-                        geometry=roi,
-                        scale=100,
-                        maxPixels=1e6
-                    ).get('NDVI').getInfo()
-                    
-                    if ndvi_info and ndvi_info > 0:
-                        print(f"✅ Successfully created NDVI image with {ndvi_info} valid pixels")
-                        return ndvi_clipped
-                    else:
-                        print(f"  ⚠️ NDVI image has no valid pixels, trying next threshold...")
-                        continue
-                        
-            except Exception as e:
-                print(f"  ❌ Error with {threshold}% threshold: {e}")
-                continue
-        
-        # If all attempts failed, try Landsat as backup
-        print("🔄 Sentinel-2 failed, trying Landsat 8...")
-        try:
-            landsat = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2') \
-                .filterBounds(roi) \
-                .filterDate(start_date, end_date) \
-                .filter(ee.Filter.lt('CLOUD_COVER', 50))
-            
-            if landsat.size().getInfo() > 0:
-                # Landsat surface reflectance NDVI
-                def apply_scale_factors(image):
-                    optical_bands = image.select('SR_B.').multiply(0.0000275).add(-0.2)
-                    return image.addBands(optical_bands, None, True)
-                
-                landsat_scaled = landsat.map(apply_scale_factors).median()
-                ndvi_landsat = landsat_scaled.normalizedDifference(['SR_B5', 'SR_B4']).rename('NDVI')
-                ndvi_clipped = ndvi_landsat.clip(roi)
-                
-                print("✅ Using Landsat 8 NDVI as backup")
-                return ndvi_clipped
-                
-        except Exception as e:
-            print(f"❌ Landsat backup also failed: {e}")
-        
-        # No satellite data available - raise error
-        raise Exception("No satellite data available for grassland analysis in the selected area and time period")
+        logger.debug("Building merged Sentinel-2/Landsat 8 greenest-pixel NDVI composite")
+
+        # Per-pixel masking replaces the old 20/40/60/80% retry ladder; scenes above its
+        # loosest bound are still dropped on metadata so the mask never maps over them
+        s2 = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
+            .filterBounds(roi) \
+            .filterDate(start_date, end_date) \
+            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 80)) \
+            .map(lambda image: self._mask_s2_clouds(image).select(['B8', 'B4'], ['NIR', 'RED']))
+
+        # Cloud-mask Landsat per pixel too, so the greenest-pixel mosaic only ranks clear
+        # observations. Scale only the two NDVI bands to reflectance: the -0.2 offset does
+        # not cancel in the NDVI ratio, so the scaling stays per scene ahead of the mosaic
+        landsat = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2') \
+            .filterBounds(roi) \
+            .filterDate(start_date, end_date) \
+            .filter(ee.Filter.lt('CLOUD_COVER', 50)) \
+            .map(lambda image: self._mask_landsat_clouds(image)
+                 .select(['SR_B5', 'SR_B4'], ['NIR', 'RED']).multiply(0.0000275).add(-0.2))
+
+        merged = s2.merge(landsat).map(self._scene_ndvi)
+
+        # No data anywhere: a fully masked NDVI band, caught by the pixel count in analyze_grassland
+        ndvi = ee.Image(ee.Algorithms.If(
+            merged.size().gt(0),
+            merged.qualityMosaic('NDVI'),
+            ee.Image.constant(0).updateMask(0).rename('NDVI')
+        ))
+
+        ndvi_clipped = ndvi.clip(roi)
+
+        if self.debug_checks:
+            ndvi_info = ndvi_clipped.reduceRegion(
+                reducer=ee.Reducer.count(),
+                geometry=roi,
+                scale=100,
+                maxPixels=1e6,
+                bestEffort=True  # Coarsen the scale instead of failing on large ROIs
+            ).get('NDVI').getInfo()
+            logger.debug("NDVI image has %s valid pixels", ndvi_info)
+
+        return ndvi_clipped
 
     def classify_vegetation(self, ndvi_image, roi) -> ee.Image:
         """
         Classifies vegetation based on NDVI thresholds.
         """
         try:
-            print("🔄 Classifying vegetation based on NDVI thresholds...")
+            logger.debug("Classifying vegetation based on NDVI thresholds")
             
             # Ensure we have a valid NDVI image
             if ndvi_image is None:
                 raise ValueError("NDVI image is None")
             
-            # Create classification
-            classified_image = ee.Image(0).rename('classification') \
-                .where(ndvi_image.gte(self.grassland_threshold_min).And(ndvi_image.lt(self.grassland_threshold_max)), 1) \
-                .where(ndvi_image.gte(self.savanna_threshold_min).And(ndvi_image.lte(self.savanna_threshold_max)), 2) \
-                .where(ndvi_image.gt(self.savanna_threshold_max), 3)
+            # Create classification in a single expression node; masked NDVI pixels
+            # fall through to class 0 (non-vegetation) as with the old .where() chain
+            classified_image = ndvi_image.unmask(-1).expression(
+                self._classification_expression
+            ).rename('classification')
             
             # Ensure proper clipping
             classified_clipped = classified_image.clip(roi)
             
-            # Verify the classification has valid data
-            class_info = classified_clipped.reduceRegion(
-                reducer=ee.Reducer.count(),
-                geometry=roi,
-                scale=100,
-                maxPixels=1e6
-            ).get('classification').getInfo()
-            
-            if class_info and class_info > 0:
-                print(f"✅ Classification completed with {class_info} valid pixels")
-                return classified_clipped
-            else:
-                raise ValueError("Classification resulted in no valid pixels")
+            if self.debug_checks:
+                # Verify the classification has valid data
+                class_info = classified_clipped.reduceRegion(
+                    reducer=ee.Reducer.count(),
+                    geometry=roi,
+                    scale=100,
+                    maxPixels=1e6,
+                    bestEffort=True  # Coarsen the scale instead of failing on large ROIs
+                ).get('classification').getInfo()
+                
+                if not class_info:
+                    raise ValueError("Classification resulted in no valid pixels")
+                logger.debug("Classification completed with %s valid pixels", class_info)
+
+            return classified_clipped
                 
         except Exception as e:
-            print(f"❌ Classification error: {e}")
+            logger.error("Classification error: %s", e)
             raise Exception(f"Vegetation classification failed: {str(e)}")
 
+    def _tile_scale(self, roi) -> ee.Number:
+        """Server-side tileScale by ROI area: 1 under 100 km², 2 under 1,000 km², 4 under 10,000 km², else 8"""
+        area_km2 = roi.area(maxError=100).divide(1e6)
+        return ee.Number(ee.Algorithms.If(
+            area_km2.lt(100), 1,
+            ee.Algorithms.If(area_km2.lt(1000), 2, ee.Algorithms.If(area_km2.lt(10000), 4, 8))
+        ))
+
     def compute_area(self, image, roi, resolution: int = 10) -> ee.List:
         """
         Computes area for each vegetation class.
         """
         try:
-            print(f"🔄 Computing areas at {resolution}m resolution...")
+            logger.debug("Computing areas at %sm resolution", resolution)
             
             pixel_area_ha = ee.Image.pixelArea().divide(10000)
             area_stats = pixel_area_ha.addBands(image).reduceRegion(
@@ -183,7 +204,7 @@ class GrasslandAPI:
                 geometry=roi,
                 scale=resolution,
                 maxPixels=1e11,
-                tileScale=2  # Add tiling for large areas
+                tileScale=self._tile_scale(roi)  # More tiling for larger areas
             )
             
             groups = area_stats.get('groups')
@@ -193,9 +214,105 @@ class GrasslandAPI:
             return groups
             
         except Exception as e:
-            print(f"❌ Area computation error: {e}")
+            logger.error("Area computation error: %s", e)
             raise Exception(f"Area computation failed: {str(e)}")
 
+    def _region_statistics(self, ndvi_image, classified_image, roi, resolution: int = 10) -> ee.Dictionary:
+        """Server-side mean NDVI, valid NDVI pixel count and per-class area (ha), fetched together"""
+        tile_scale = self._tile_scale(roi)  # More tiling for larger areas
+
+        # Separate reductions: a multi-input reducer only counts pixels where every input band is
+        # unmasked, so reading area + class alongside NDVI would drop NDVI-masked (cloudy) pixels
+        ndvi_stats = ndvi_image.reduceRegion(
+            reducer=ee.Reducer.mean().combine(ee.Reducer.count(), sharedInputs=True),
+            geometry=roi,
+            scale=resolution,
+            maxPixels=1e11,
+            tileScale=tile_scale
+        )
+        area_stats = ee.Image.pixelArea().divide(10000).addBands(classified_image).reduceRegion(
+            reducer=ee.Reducer.sum().group(groupField=1, groupName='class'),
+            geometry=roi,
+            scale=resolution,
+            maxPixels=1e11,
+            tileScale=tile_scale
+        )
+
+        return ee.Dictionary({
+            'area_groups': area_stats.get('groups'),
+            'mean_ndvi': ndvi_stats.get('NDVI_mean'),
+            'pixel_count': ndvi_stats.get('NDVI_count')
+        })
+
+    def _fishnet(self, roi, bounds: List, tile_km: float = 64) -> List:
+        """Split the ROI bounding box into ~tile_km square tiles, each intersected with the ROI"""
+        lons = [point[0] for point in bounds]
+        lats = [point[1] for point in bounds]
+        west, east, south, north = min(lons), max(lons), min(lats), max(lats)
+
+        # Degree steps for tile_km at the box's mid-latitude
+        height = tile_km / 111.32
+        width = tile_km / (111.32 * max(math.cos(math.radians((south + north) / 2)), 0.01))
+        cols = max(1, math.ceil((east - west) / width))
+        rows = max(1, math.ceil((north - south) / height))
+
+        return [
+            ee.Geometry.Rectangle([
+                west + col * width, south + row * height,
+                min(east, west + (col + 1) * width), min(north, south + (row + 1) * height)
+            ]).intersection(roi, maxError=1)
+            for row in range(rows)
+            for col in range(cols)
+        ]
+
+    def _sharded_statistics(self, ndvi_image, classified_image, roi, resolution: int = 10,
+                            tile_km: float = 64, min_area_km2: float = 100) -> Dict[str, Any]:
+        """
+        Reduce statistics per fishnet tile in parallel and merge them on the client.
+        ROIs under min_area_km2 skip the fishnet and use the single fused reduction.
+        """
+        results = ee.Dictionary({
+            'roi_area_m2': roi.area(),
+            'bounds': roi.bounds().coordinates().get(0)
+        }).getInfo()
+        bounds = results.pop('bounds')
+
+        if results['roi_area_m2'] < min_area_km2 * 1e6:
+            results.update(self._region_statistics(ndvi_image, classified_image, roi, resolution).getInfo())
+            return results
+
+        tiles = self._fishnet(roi, bounds, tile_km)
+        logger.debug("Reducing statistics over %d ROI tiles", len(tiles))
+        with ThreadPoolExecutor(max_workers=min(len(tiles), 25)) as executor:
+            tile_results = list(executor.map(
+                lambda tile: self._region_statistics(ndvi_image, classified_image, tile, resolution).getInfo(), tiles
+            ))
+
+        # Concatenate the per-tile class groups (summed later by _class_areas), sum pixel
+        # counts, and take the pixel-count-weighted mean NDVI
+        area_groups = []
+        ndvi_sum, pixel_count = 0.0, 0
+        for tile_result in tile_results:
+            area_groups.extend(tile_result.get('area_groups') or [])
+            count = tile_result.get('pixel_count') or 0
+            if count and tile_result.get('mean_ndvi') is not None:
+                ndvi_sum += tile_result['mean_ndvi'] * count
+                pixel_count += count
+
+        results['area_groups'] = area_groups
+        results['mean_ndvi'] = ndvi_sum / pixel_count if pixel_count else None
+        results['pixel_count'] = pixel_count
+        return results
+
+    def _class_areas(self, area_groups: List[Dict[str, Any]]) -> np.ndarray:
+        """Sum class-area groups (possibly repeated across tiles) into a class-indexed array [0..3]"""
+        areas = np.zeros(4, dtype=np.float64)
+        if area_groups:
+            classes = np.fromiter((item['class'] for item in area_groups), dtype=np.intp, count=len(area_groups))
+            sums = np.fromiter((item['sum'] for item in area_groups), dtype=np.float64, count=len(area_groups))
+            np.add.at(areas, classes, sums)
+        return areas
+
     def estimate_carbon(self, area_ha_grassland: float, area_ha_savanna: float) -> tuple:
         """Estimates total biomass, carbon stock, and CO2 equivalent from class areas."""
         total_biomass = (area_ha_grassland * self.biomass_grassland) + (area_ha_savanna * self.biomass_savanna)
@@ -206,99 +323,118 @@ class GrasslandAPI:
     def analyze_grassland(self, roi_coords: Union[List, dict], 
                          start_date: str = "2021-01-01", 
                          end_date: str = "2023-01-01", 
-                         resolution: int = 10) -> Dict[str, Any]:
+                         resolution: int = 10,
+                         shard: bool = False,
+                         include_image: bool = True) -> Dict[str, Any]:
         """
         Main workflow function for grassland analysis.
+        Set shard=True for very large ROIs to reduce statistics over a fishnet of tiles in parallel.
+        Set include_image=False for statistics-only callers; the result then holds no ee.Image.
+        Results are memoized per (ROI, dates, resolution); failed analyses are not cached.
         """
         try:
-            print("🔄 Starting grassland analysis...")
-            
             # Validate inputs
             start_date, end_date = self._validate_dates(start_date, end_date)
-            roi = self._create_geometry(roi_coords)
+            result = self._run_grassland_analysis(roi_key(roi_coords), start_date, end_date, resolution, shard)
+            if not include_image:
+                result = {key: value for key, value in result.items() if key != "classification_image"}
+            return result
 
-            # Get NDVI image
-            ndvi_img = self.get_ndvi_image(roi, start_date, end_date)
-            
-            if ndvi_img is None:
-                raise ValueError("Failed to obtain NDVI image")
+        except Exception as e:
+            logger.error("Grassland analysis failed: %s", e)
+            return {
+                "status": "error",
+                "error": str(e),
+                "message": "Grassland analysis failed - no satellite data available for the selected area and time period"
+            }
 
-            # Calculate mean NDVI
-            try:
-                mean_ndvi_dict = ndvi_img.reduceRegion(
-                    reducer=ee.Reducer.mean(),
-                    geometry=roi,
-                    scale=50,
-                    maxPixels=1e9
-                )
-                mean_ndvi = mean_ndvi_dict.get("NDVI").getInfo()
-                if mean_ndvi is None:
-                    raise ValueError("Failed to calculate mean NDVI")
-                print(f"✅ Mean NDVI: {mean_ndvi:.3f}")
-            except Exception as e:
-                print(f"❌ Mean NDVI calculation failed: {e}")
-                raise Exception(f"NDVI calculation failed: {str(e)}")
+    def _build_pipeline(self, roi, start_date: str, end_date: str, resolution: int = 10) -> Dict[str, Any]:
+        """
+        Build the grassland pipeline as server-side objects only (no getInfo()):
+        NDVI composite, classification image and the fused statistics dictionary.
+        """
+        # Get NDVI image (server-side source selection, no round trips)
+        ndvi_img = self.get_ndvi_image(roi, start_date, end_date)
 
-            # Classify vegetation
-            classified_img = self.classify_vegetation(ndvi_img, roi)
-            
-            if classified_img is None:
-                raise ValueError("Failed to create classification")
+        # Classify vegetation
+        classified_img = self.classify_vegetation(ndvi_img, roi)
 
-            # Compute areas
-            area_results_list = ee.List(self.compute_area(classified_img, roi, resolution)).getInfo()
-            
-            if not area_results_list:
-                raise ValueError("Area computation returned empty results")
-            
-            area_by_class = {item['class']: item['sum'] for item in area_results_list}
-            non_vegetation_area = area_by_class.get(0, 0)
-            grassland_area = area_by_class.get(1, 0)
-            savanna_area = area_by_class.get(2, 0)
-            dense_vegetation_area = area_by_class.get(3, 0)
+        return {
+            'ndvi': ndvi_img,
+            'classified': classified_img,
+            'stats': self._region_statistics(ndvi_img, classified_img, roi, resolution).set(
+                'roi_area_m2', roi.area()
+            )
+        }
 
-            # Calculate total area
-            try:
-                total_area = roi.area().getInfo() / 10000  # Convert to hectares
-                total_area_km2 = total_area / 100  # Convert to km²
-            except Exception as e:
-                print(f"ROI area calculation failed: {e}, estimating from class areas")
-                total_area = sum(area_by_class.values())
-                total_area_km2 = total_area / 100
+    @analysis_cache(maxsize=256)
+    def _run_grassland_analysis(self, roi_json: str, start_date: str, end_date: str,
+                                resolution: int, shard: bool = False) -> Dict[str, Any]:
+        """Run the grassland pipeline for a canonicalized ROI key"""
+        logger.debug("Starting grassland analysis")
+        roi = geometry_from_json(roi_json)
 
-            # Estimate biomass and carbon
-            total_biomass, carbon_stock, co2eq = self.estimate_carbon(grassland_area, savanna_area)
+        pipeline = self._build_pipeline(roi, start_date, end_date, resolution)
+        classified_img = pipeline['classified']
 
-            print("✅ Grassland analysis completed successfully")
-            
-            return {
-                "status": "success",
-                "classification_image": classified_img,
-                "statistics": {
-                    "roi_area_hectares": round(total_area, 2),
-                    "roi_area_km2": round(total_area_km2, 2),
-                    "mean_ndvi": round(mean_ndvi, 3),
-                    "vegetation_classification": {
-                        "non_vegetation_area_ha": round(non_vegetation_area, 2),
-                        "grassland_area_ha": round(grassland_area, 2),
-                        "savanna_area_ha": round(savanna_area, 2),
-                        "dense_vegetation_area_ha": round(dense_vegetation_area, 2)
-                    },
-                    "carbon_estimation": {
-                        "total_biomass_Mg": round(total_biomass, 2),
-                        "total_carbon_stock_MgC": round(carbon_stock, 2),
-                        "co2_equivalent_MgCO2e": round(co2eq, 2)
-                    }
+        if shard:
+            results = self._sharded_statistics(pipeline['ndvi'], classified_img, roi, resolution)
+        else:
+            # Fetch every statistic in a single round trip over a single pixel scan
+            results = pipeline['stats'].getInfo()
+
+        mean_ndvi = results.get('mean_ndvi')
+        if not results.get('pixel_count') or mean_ndvi is None:
+            raise Exception("No satellite data available for grassland analysis in the selected area and time period")
+        logger.debug("Mean NDVI: %.3f", mean_ndvi)
+
+        area_results_list = results.get('area_groups')
+        if not area_results_list:
+            raise ValueError("Area computation returned empty results")
+
+        non_vegetation_area, grassland_area, savanna_area, dense_vegetation_area = \
+            self._class_areas(area_results_list).tolist()
+
+        # Calculate total area
+        total_area = results['roi_area_m2'] / 10000  # Convert to hectares
+        total_area_km2 = total_area / 100  # Convert to km²
+
+        # Estimate biomass and carbon
+        total_biomass, carbon_stock, co2eq = self.estimate_carbon(grassland_area, savanna_area)
+
+        logger.info("Grassland analysis completed successfully")
+
+        return {
+            "status": "success",
+            "classification_image": classified_img,
+            "statistics": {
+                "roi_area_hectares": round(total_area, 2),
+                "roi_area_km2": round(total_area_km2, 2),
+                "mean_ndvi": round(mean_ndvi, 3),
+                "vegetation_classification": {
+                    "non_vegetation_area_ha": round(non_vegetation_area, 2),
+                    "grassland_area_ha": round(grassland_area, 2),
+                    "savanna_area_ha": round(savanna_area, 2),
+                    "dense_vegetation_area_ha": round(dense_vegetation_area, 2)
+                },
+                "carbon_estimation": {
+                    "total_biomass_Mg": round(total_biomass, 2),
+                    "total_carbon_stock_MgC": round(carbon_stock, 2),
+                    "co2_equivalent_MgCO2e": round(co2eq, 2)
                 }
             }
+        }
 
-        except Exception as e:
-            print(f"❌ Grassland analysis failed: {e}")
-            return {
-                "status": "error",
-                "error": str(e),
-                "message": "Grassland analysis failed - no satellite data available for the selected area and time period"
-            }
+    def analyze_grassland_batch(self, jobs: List[Tuple[Union[List, dict], str, str, int]],
+                                max_workers: int = 25) -> List[Dict[str, Any]]:
+        """
+        Run analyze_grassland for many (roi_coords, start_date, end_date, resolution) jobs.
+        Each job blocks on Earth Engine latency, so jobs run on a thread pool; results keep job order.
+        """
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            return list(executor.map(lambda job: self.analyze_grassland(*job), jobs))
 
     def format_statistics(self, raw_statistics: Dict[str, Any]) -> Dict[str, Any]:
         """Format stored statistics for frontend display without re-running analysis"""
@@ -332,22 +468,59 @@ class GrasslandAPI:
                                             start_date: str, end_date: str, resolution: int = 10) -> ee.Image:
         """Create a grassland classification image for visualization."""
         try:
-            result = self.analyze_grassland(roi_coords, start_date, end_date, resolution)
-            
-            if result["status"] == "success" and result.get("classification_image") is not None:
-                return result["classification_image"].rename('grassland_class')
-            else:
-                raise Exception(result.get("error", "Classification failed"))
+            start_date, end_date = self._validate_dates(start_date, end_date)
+            roi = self._create_geometry(roi_coords)
+
+            # Only the deferred image is needed - no statistics round trip
+            return self._build_pipeline(roi, start_date, end_date, resolution)['classified'].rename('grassland_class')
                 
         except Exception as e:
-            print(f"❌ Classification image creation failed: {e}")
+            logger.error("Classification image creation failed: %s", e)
             raise Exception(f"Grassland classification failed: {str(e)}")
 
+    def export_classification_tiles(self, roi_coords: Union[List, dict], start_date: str, end_date: str,
+                                    out_dir: str, scale: int = 10, num_workers: int = 25) -> List[str]:
+        """
+        Download the classification as GeoTIFF tiles in parallel via getDownloadURL.
+        Tiles are ~2048 pixels on a side so each response stays under the 32 MB request limit.
+        Returns the paths of the written files; raises if any tile could not be exported,
+        so callers never receive a mosaic with silent holes.
+        """
+        start_date, end_date = self._validate_dates(start_date, end_date)
+        roi = self._create_geometry(roi_coords)
+        classified = self._build_pipeline(roi, start_date, end_date, scale)['classified'].toByte()
+
+        bounds = roi.bounds().coordinates().get(0).getInfo()
+        tiles = self._fishnet(roi, bounds, tile_km=scale * 2048 / 1000)
+        os.makedirs(out_dir, exist_ok=True)
+        logger.debug("Exporting %d classification tiles to %s", len(tiles), out_dir)
+
+        def fetch(indexed_tile):
+            index, tile = indexed_tile
+            path = os.path.join(out_dir, f"grassland_class_{index:04d}.tif")
+            try:
+                url = call_with_retry(classified.getDownloadURL,
+                                      {'region': tile, 'scale': scale, 'format': 'GEO_TIFF'})
+                with urllib.request.urlopen(url) as response, open(path, 'wb') as out_file:
+                    out_file.write(response.read())
+                return path
+            except Exception as e:
+                logger.warning("Tile %d export failed: %s", index, e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(num_workers, len(tiles))) as executor:
+            paths = list(executor.map(fetch, enumerate(tiles)))
+
+        failed = [index for index, path in enumerate(paths) if path is None]
+        if failed:
+            raise Exception(f"Classification tile export failed for {len(failed)} of {len(tiles)} tiles: {failed}")
+        return paths
+
     def get_grassland_statistics(self, roi_coords: Union[List, dict], 
                                start_date: str, end_date: str, resolution: int = 10) -> Dict[str, Any]:
         """Get detailed grassland statistics by running full analysis."""
         try:
-            result = self.analyze_grassland(roi_coords, start_date, end_date, resolution)
+            result = self.analyze_grassland(roi_coords, start_date, end_date, resolution, include_image=False)
             
             if result["status"] == "error":
                 return result
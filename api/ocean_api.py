@@ -1,70 +1,164 @@
+import bisect
 import ee
-from datetime import datetime
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
 from typing import List, Union, Dict, Any
 
+from api.cache import analysis_cache
+from api.geometry import geometry_from_json, roi_key
+
+logger = logging.getLogger(__name__)
+
+# Opt-in persistent statistics cache (survives restarts/redeploys); disabled when unset
+_DISK_CACHE_TTL_SECONDS = 30 * 24 * 3600
+_DISK_CACHE_MAX_ENTRY_BYTES = 64 * 1024
+
+
+def _axis_aligned_bounds(roi_coords) -> Union[List[float], None]:
+    """[minLon, minLat, maxLon, maxLat] for a flat bbox or an axis-aligned rectangle ring, else None"""
+    if len(roi_coords) == 4 and all(isinstance(v, (int, float)) for v in roi_coords):
+        return list(roi_coords)
+    ring = roi_coords[:-1] if len(roi_coords) == 5 and roi_coords[0] == roi_coords[-1] else roi_coords
+    if len(ring) != 4 or not all(isinstance(p, (list, tuple)) and len(p) == 2 for p in ring):
+        return None
+    lons = sorted({p[0] for p in ring})
+    lats = sorted({p[1] for p in ring})
+    if len(lons) != 2 or len(lats) != 2 or len({tuple(p) for p in ring}) != 4:
+        return None
+    # Consecutive vertices must share a longitude or a latitude (no diagonal edges)
+    for a, b in zip(ring, ring[1:] + ring[:1]):
+        if a[0] != b[0] and a[1] != b[1]:
+            return None
+    return [lons[0], lats[0], lons[1], lats[1]]
+
+
+def _fast_roi_area_km2(roi_coords) -> Union[float, None]:
+    """
+    Spherical-excess (Chamberlain-Duquette) area of a coordinate ring or bbox, in km².
+    Returns None for non-ring input and for ROIs above 50,000 km², where EE's area is used instead.
+    """
+    bounds = _axis_aligned_bounds(roi_coords)
+    if bounds is not None:
+        min_lon, min_lat, max_lon, max_lat = bounds
+        ring = [[min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat]]
+    elif len(roi_coords) >= 3 and all(isinstance(p, (list, tuple)) and len(p) == 2 for p in roi_coords):
+        ring = roi_coords
+    else:
+        return None
+
+    total = 0.0
+    for (lon1, lat1), (lon2, lat2) in zip(ring, ring[1:] + ring[:1]):
+        total += math.radians(lon2 - lon1) * (2 + math.sin(math.radians(lat1)) + math.sin(math.radians(lat2)))
+    area_km2 = abs(total) * 6371.0088 ** 2 / 2
+    return area_km2 if area_km2 <= 50000 else None
+
+
+@lru_cache(maxsize=256)
+def _ocean_geometry(roi_json: str):
+    """ROI geometry per canonical JSON; bounding boxes become planar Rectangles (compact, no geodesic edges)"""
+    bounds = _axis_aligned_bounds(json.loads(roi_json))
+    if bounds is not None:
+        return ee.Geometry.Rectangle(bounds, proj='EPSG:4326', geodesic=False)
+    return geometry_from_json(roi_json)
+
+
 class OceanAPI:
     """
     Simplified Ocean Analysis API - Multiple Satellites, No Synthetic Fallbacks
     """
 
-    def __init__(self):
-        """Initialize Ocean API with chlorophyll classification thresholds"""
-        self.chl_thresholds = {
-            'oligotrophic': 5.0,      # 0-5 mg/m³
-            'mesotrophic': 15.0,      # 5-15 mg/m³
-            'moderate_eutrophic': 30.0, # 15-30 mg/m³
-            'eutrophic': 90.0,        # 30-90 mg/m³
-            'hypereutrophic': 100.0   # 90+ mg/m³
-        }
+    _DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+    # Chlorophyll classification thresholds - shared, read-only class constants
+    chl_thresholds = MappingProxyType({
+        'oligotrophic': 5.0,      # 0-5 mg/m³
+        'mesotrophic': 15.0,      # 5-15 mg/m³
+        'moderate_eutrophic': 30.0, # 15-30 mg/m³
+        'eutrophic': 90.0,        # 30-90 mg/m³
+        'hypereutrophic': 100.0   # 90+ mg/m³
+    })
+
+    # Sorted upper bounds (inclusive) and labels for the bisect-based classifiers
+    _trophic_thresholds = (
+        chl_thresholds['oligotrophic'], chl_thresholds['mesotrophic'],
+        chl_thresholds['moderate_eutrophic'], chl_thresholds['eutrophic']
+    )
+    _trophic_labels = (
+        "Oligotrophic (Very Low)", "Mesotrophic (Low)", "Moderately Eutrophic",
+        "Eutrophic (High)", "Hypereutrophic (Very High)"
+    )
+    _water_quality_thresholds = (5.0, 15.0, 30.0, 90.0)
+    _water_quality_labels = (
+        "Excellent - Clear ocean water", "Good - Productive ocean", "Moderate - Highly productive",
+        "Poor - Very productive, potential issues", "Very Poor - High bloom risk"
+    )
+    _bloom_risk_thresholds = (15.0, 30.0, 90.0)
+    _bloom_risk_labels = ("Low", "Moderate", "High", "Very High - Immediate concern")
+
+    # Multiple satellite datasets for chlorophyll analysis (priority order)
+    satellite_sources = (
+        MappingProxyType({
+            'name': 'MODIS Aqua L3SMI',
+            'dataset': 'NASA/OCEANDATA/MODIS-Aqua/L3SMI',
+            'band': 'chlor_a',
+            'scale': 4638
+        }),
+        MappingProxyType({
+            'name': 'VIIRS SNPP L3SMI',
+            'dataset': 'NASA/OCEANDATA/VIIRS-SNPP/L3SMI', 
+            'band': 'chlor_a',
+            'scale': 4638
+        }),
+        MappingProxyType({
+            'name': 'MODIS Terra L3SMI',
+            'dataset': 'NASA/OCEANDATA/MODIS-Terra/L3SMI',
+            'band': 'chlor_a', 
+            'scale': 4638
+        }),
+        MappingProxyType({
+            'name': 'Sentinel-3 OLCI',
+            'dataset': 'COPERNICUS/S3/OLCI',
+            'band': ('Oa08_radiance', 'Oa06_radiance'),
+            'scale': 300
+        })
+    )
 
-        # Multiple satellite datasets for chlorophyll analysis (priority order)
-        self.satellite_sources = [
-            {
-                'name': 'MODIS Aqua L3SMI',
-                'dataset': 'NASA/OCEANDATA/MODIS-Aqua/L3SMI',
-                'band': 'chlor_a',
-                'scale': 4638
-            },
-            {
-                'name': 'VIIRS SNPP L3SMI',
-                'dataset': 'NASA/OCEANDATA/VIIRS-SNPP/L3SMI', 
-                'band': 'chlor_a',
-                'scale': 4638
-            },
-            {
-                'name': 'MODIS Terra L3SMI',
-                'dataset': 'NASA/OCEANDATA/MODIS-Terra/L3SMI',
-                'band': 'chlor_a', 
-                'scale': 4638
-            },
-            {
-                'name': 'Sentinel-3 OLCI',
-                'dataset': 'COPERNICUS/S3/OLCI',
-                'band': ['Oa08_radiance', 'Oa06_radiance'],
-                'scale': 300
-            }
-        ]
+    def __init__(self):
+        """Initialize Ocean API; set OCEAN_API_CACHE_DIR to persist statistics across restarts"""
+        self._disk_cache_dir = os.environ.get('OCEAN_API_CACHE_DIR')
 
     def _create_geometry(self, roi_coords: Union[List, dict]):
         """Create Earth Engine geometry from coordinates."""
         if isinstance(roi_coords, list):
-            return ee.Geometry.Polygon([roi_coords])
+            return _ocean_geometry(roi_key(roi_coords))
         else:
             raise ValueError("Invalid ROI coordinates format")
 
     def _validate_dates(self, start_date: str, end_date: str):
-        """Validate dates."""
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            if start > end:
-                raise ValueError("start_date must be earlier than end_date")
-            return start_date, end_date
-        except Exception as e:
-            raise ValueError(f"Invalid date format: {str(e)}")
+        """Validate dates with a precompiled pattern and the C-implemented date.fromisoformat."""
+        for date_str in (start_date, end_date):
+            if not isinstance(date_str, str) or not self._DATE_RE.match(date_str):
+                raise ValueError(f"Invalid date format: {date_str!r} does not match format 'YYYY-MM-DD'")
+            try:
+                date.fromisoformat(date_str)
+            except ValueError as e:
+                raise ValueError(f"Invalid date format: {str(e)}")
+        # Zero-padded ISO dates order lexically
+        if start_date > end_date:
+            raise ValueError("Invalid date format: start_date must be earlier than end_date")
+        return start_date, end_date
 
     def _create_ocean_mask(self, roi) -> ee.Image:
-        """Create ocean mask using JRC Global Surface Water"""
+        """Create ocean mask using JRC Global Surface Water (all-ocean for ROIs with no land)"""
         try:
             # Use JRC Global Surface Water to identify water bodies
             jrc_water = ee.Image("JRC/GSW1_4/GlobalSurfaceWater")
@@ -73,61 +167,199 @@ class OceanAPI:
             water_occurrence = jrc_water.select('occurrence')
             ocean_mask = water_occurrence.gt(10)  # Areas with >10% water occurrence
             
-            # Clean up the mask
+            # Clean up the mask; left in the default projection so each consumer (300 m OLCI
+            # reductions, the classification) samples the coastline at its own scale
             ocean_mask = ocean_mask.focal_max(radius=2, kernelType='circle') \
                 .focal_min(radius=1, kernelType='circle')
+
+            # Fully offshore ROIs touch no land boundary polygon: decided server-side, so the
+            # JRC morphology branch is never evaluated for them and no round trip is added
+            land_features = ee.FeatureCollection('USDOS/LSIB_SIMPLE/2017').filterBounds(roi).size()
+            ocean_mask = ee.Image(ee.Algorithms.If(
+                land_features.gt(0),
+                ocean_mask,
+                ee.Image.constant(1)
+            ))
             
             return ocean_mask.clip(roi).rename('ocean_mask')
             
         except Exception as e:
-            print(f"Ocean mask creation error: {e}")
+            logger.error("Ocean mask creation error: %s", e)
             raise Exception("Unable to create ocean mask for the selected area")
 
-    def _get_chlorophyll_data(self, roi, start_date: str, end_date: str, ocean_mask: ee.Image) -> Dict[str, Any]:
+    @analysis_cache(maxsize=128)
+    def _ocean_mask_for(self, roi_json: str) -> ee.Image:
+        """Ocean mask per canonical ROI - the JRC asset is static, so the graph node is reused"""
+        return self._create_ocean_mask(_ocean_geometry(roi_json))
+
+    @analysis_cache(maxsize=256)
+    def _chlorophyll_data_for(self, roi_json: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Chlorophyll result memoized per (ROI, date range); failures raise and are not cached"""
+        return self._get_chlorophyll_data(
+            _ocean_geometry(roi_json), start_date, end_date, self._ocean_mask_for(roi_json),
+            _fast_roi_area_km2(json.loads(roi_json))
+        )
+
+    def _get_chlorophyll_data(self, roi, start_date: str, end_date: str, ocean_mask: ee.Image,
+                              roi_area_km2: Union[float, None] = None) -> Dict[str, Any]:
         """Try multiple satellite sources for chlorophyll data - NO SYNTHETIC FALLBACKS"""
-        
+        if roi_area_km2 is None:
+            # Large or non-ring ROIs: fetched server-side together with the chosen source's statistics
+            roi_area_km2 = roi.area().divide(1e6)
+
+        # Image counts for every source in one round trip, so reductions only run on sources with data
+        logger.debug("Counting images across %d satellite sources", len(self.satellite_sources))
+        # The filtered collections are shared with the processors, so counts and composites reuse one filter node
+        collections = {
+            source['name']: self._source_collection(source, roi, start_date, end_date)
+            for source in self.satellite_sources
+        }
+        image_counts = ee.Dictionary({name: collection.size() for name, collection in collections.items()})
+        image_counts = image_counts.getInfo()
+
+        # Highest-priority source with valid data wins; usually the first candidate
         for source in self.satellite_sources:
+            if not image_counts.get(source['name']):
+                logger.debug("%s: no images found", source['name'])
+                continue
             try:
-                print(f"🔍 Trying {source['name']} for chlorophyll data...")
-                
-                if source['name'] == 'Sentinel-3 OLCI':
-                    result = self._process_sentinel3_olci(roi, start_date, end_date, ocean_mask)
-                else:
-                    result = self._process_ocean_color_data(
-                        source['dataset'], source['band'], source['scale'],
-                        roi, start_date, end_date, ocean_mask
-                    )
-                
-                if result['data_available'] and result['mean_chlorophyll'] is not None:
-                    result['data_source'] = source['name']
-                    print(f"Successfully obtained data from {source['name']}")
-                    return result
-                else:
-                    print(f"{source['name']}: No valid data found")
-                    
+                result = self._fetch_source(source, collections[source['name']], roi, ocean_mask, roi_area_km2)
             except Exception as e:
-                print(f"{source['name']} failed: {e}")
+                logger.warning("%s failed: %s", source['name'], e)
                 continue
+            if result is not None:
+                logger.debug("Obtained data from %s", source['name'])
+                return result
+            logger.debug("%s: no valid data found", source['name'])
         
         # If all sources fail, raise error - NO FALLBACKS
         raise Exception("No ocean chlorophyll data available for the selected area and time period. Please select coastal or marine areas with sufficient ocean coverage.")
 
-    def _process_ocean_color_data(self, dataset: str, band: str, scale: int, 
-                                roi, start_date: str, end_date: str, ocean_mask: ee.Image) -> Dict[str, Any]:
-        """Process standard ocean color datasets"""
-        collection = ee.ImageCollection(dataset) \
+    def _fetch_source(self, source: Dict[str, Any], collection: ee.ImageCollection, roi, ocean_mask: ee.Image,
+                      roi_area_km2) -> Union[Dict[str, Any], None]:
+        """Fetch one source's chlorophyll statistics; returns None when it has no valid data"""
+        result = self._process_source(source, collection, ocean_mask)
+
+        # Image count, mean chlorophyll and areas in a single round trip. The median of an
+        # empty collection has no bands, so only reduce when there are images
+        image_count = result['image_count']
+        scale = self._statistics_scale(source['scale'], roi_area_km2)
+        info = ee.Dictionary(ee.Algorithms.If(
+            image_count.gt(0),
+            self._chlorophyll_statistics(result['chl_image'], ocean_mask, roi, scale),
+            ee.Dictionary({})
+        )).combine({
+            'images_processed': image_count,
+            'roi_area_km2': roi_area_km2
+        })
+        info = info.getInfo()
+        logger.debug("%s: found %s images", source['name'], info['images_processed'])
+
+        mean_chl = info.get('mean_chlorophyll')
+        if not info['images_processed'] or mean_chl is None or mean_chl <= 0:
+            return None
+
+        return {
+            'chl_image': result['chl_image'],
+            'mean_chlorophyll': round(mean_chl, 3),
+            'data_available': True,
+            'images_processed': info['images_processed'],
+            'roi_area_km2': info['roi_area_km2'],
+            'ocean_area_km2': info.get('ocean_area_km2') or 0,
+            'data_source': source['name']
+        }
+
+    def _source_collection(self, source: Dict[str, Any], roi, start_date: str, end_date: str) -> ee.ImageCollection:
+        """A source's collection filtered to the ROI and date range"""
+        return ee.ImageCollection(source['dataset']) \
             .filterBounds(roi) \
-            .filterDate(start_date, end_date) \
-            .select(band)
+            .filterDate(start_date, end_date)
+
+    def _process_source(self, source: Dict[str, Any], collection: ee.ImageCollection,
+                        ocean_mask: ee.Image) -> Dict[str, Any]:
+        """Build one source's chlorophyll image and image count (server-side only)"""
+        if source['name'] == 'Sentinel-3 OLCI':
+            return self._process_sentinel3_olci(collection, ocean_mask)
+        return self._process_ocean_color_data(collection, source['band'], ocean_mask)
+
+    def _disk_cache_path(self, roi_json: str, start_date: str, end_date: str) -> str:
+        """Cache file for an (ROI, date range) key"""
+        key = hashlib.sha256(json.dumps([roi_json, start_date, end_date]).encode()).hexdigest()
+        return os.path.join(self._disk_cache_dir, f"{key}.json")
+
+    def _disk_cache_get(self, roi_json: str, start_date: str, end_date: str) -> Union[Dict[str, Any], None]:
+        """Return cached statistics if present and younger than the TTL"""
+        if not self._disk_cache_dir:
+            return None
+        path = self._disk_cache_path(roi_json, start_date, end_date)
+        try:
+            if time.time() - os.path.getmtime(path) > _DISK_CACHE_TTL_SECONDS:
+                return None
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_cache_put(self, roi_json: str, start_date: str, end_date: str, statistics: Dict[str, Any]):
+        """Persist successful statistics (JSON only, size-capped); cache failures are ignored"""
+        if not self._disk_cache_dir:
+            return
+        payload = json.dumps(statistics)
+        if len(payload) > _DISK_CACHE_MAX_ENTRY_BYTES:
+            return
+        path = self._disk_cache_path(roi_json, start_date, end_date)
+        try:
+            os.makedirs(self._disk_cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+                cache_file.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Ocean statistics cache write failed: %s", e)
+
+    def _statistics_scale(self, source_scale: int, roi_area_km2) -> Union[int, ee.Number]:
+        """
+        Reduction scale: the source's native resolution, clamped to 300 m for ROIs under 1,000 km²
+        where a ~4.6 km grid would leave too few pixels for a meaningful ocean area.
+        """
+        if isinstance(roi_area_km2, float):
+            return min(source_scale, 300) if roi_area_km2 < 1000 else source_scale
+        return ee.Number(ee.Algorithms.If(
+            ee.Number(roi_area_km2).lt(1000), min(source_scale, 300), source_scale
+        ))
+
+    def _chlorophyll_statistics(self, chl_image: ee.Image, ocean_mask: ee.Image, roi, scale) -> ee.Dictionary:
+        """Server-side mean chlorophyll and ocean area (km²) from a single reduceRegion pass"""
+        # One sum over [chl * valid, valid, pixel area] within the ocean mask: the mean is
+        # sum(chl)/sum(valid), and ocean pixels without valid chlorophyll still count as ocean area
+        valid = chl_image.mask().rename('valid')
+        stack = ee.Image.cat(
+            chl_image.unmask(0).multiply(valid).rename('chl'),
+            valid,
+            ee.Image.pixelArea().divide(1e6).rename('area')
+        ).updateMask(ocean_mask)
+
+        sums = stack.reduceRegion(
+            reducer=ee.Reducer.sum(),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9,
+            tileScale=4
+        )
 
-        image_count = collection.size().getInfo()
-        print(f"  Found {image_count} images")
+        valid_sum = ee.Number(sums.get('valid'))
+        return ee.Dictionary({
+            'mean_chlorophyll': ee.Algorithms.If(valid_sum.gt(0), ee.Number(sums.get('chl')).divide(valid_sum), None),
+            'ocean_area_km2': sums.get('area')
+        })
 
-        if image_count == 0:
-            return {'data_available': False, 'mean_chlorophyll': None}
+    def _process_ocean_color_data(self, collection: ee.ImageCollection, band: str,
+                                  ocean_mask: ee.Image) -> Dict[str, Any]:
+        """Build the chlorophyll image and server-side image count for a standard ocean color dataset"""
+        image_count = collection.size()
 
         # Get median composite
-        chl_median = collection.median()
+        chl_median = collection.select(band).median()
         
         # Apply ocean mask
         chl_ocean_only = chl_median.updateMask(ocean_mask)
@@ -137,77 +369,34 @@ class OceanAPI:
             chl_ocean_only.gt(0.01).And(chl_ocean_only.lt(100))
         )
 
-        # Calculate statistics
-        chl_stats = chl_cleaned.reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=roi,
-            scale=scale,
-            maxPixels=1e9
-        )
-
-        mean_chl = chl_stats.get(band).getInfo()
-        
-        if mean_chl is None or mean_chl <= 0:
-            return {'data_available': False, 'mean_chlorophyll': None}
-
         return {
-            'chl_image': chl_cleaned.clip(roi).rename('chlor_a'),
-            'mean_chlorophyll': round(mean_chl, 3),
-            'data_available': True,
-            'images_processed': image_count
+            'chl_image': chl_cleaned.rename('chlor_a'),
+            'image_count': image_count
         }
 
-    def _process_sentinel3_olci(self, roi, start_date: str, end_date: str, ocean_mask: ee.Image) -> Dict[str, Any]:
-        """Process Sentinel-3 OLCI data and convert to chlorophyll"""
-        try:
-            s3_collection = ee.ImageCollection('COPERNICUS/S3/OLCI') \
-                .filterBounds(roi) \
-                .filterDate(start_date, end_date) \
-                .select(['Oa08_radiance', 'Oa06_radiance'])
-
-            image_count = s3_collection.size().getInfo()
-            print(f"  Found {image_count} Sentinel-3 OLCI images")
-
-            if image_count == 0:
-                return {'data_available': False, 'mean_chlorophyll': None}
-
-            # Get median composite
-            s3_image = s3_collection.median().clip(roi)
+    def _process_sentinel3_olci(self, collection: ee.ImageCollection, ocean_mask: ee.Image) -> Dict[str, Any]:
+        """Build Sentinel-3 OLCI chlorophyll (via NDCI) and server-side image count"""
+        image_count = collection.size()
+        s3_collection = collection.select(['Oa08_radiance', 'Oa06_radiance'])
 
-            # Calculate NDCI (Normalized Difference Chlorophyll Index)
-            ndci = s3_image.normalizedDifference(['Oa06_radiance', 'Oa08_radiance']).rename('NDCI')
-            
-            # Convert NDCI to chlorophyll concentration using empirical relationship
-            # Empirical formula: Chl-a = 10^(1.61 * NDCI + 0.082)
-            # Simplified for this application: Chl-a ≈ NDCI * 25 + 2.5
-            chl_estimate = ndci.multiply(25).add(2.5).clamp(0.1, 100).rename('chlor_a')
-            
-            # Apply ocean mask
-            chl_ocean = chl_estimate.updateMask(ocean_mask)
-
-            # Calculate statistics
-            chl_stats = chl_ocean.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=roi,
-                scale=300,
-                maxPixels=1e9
-            )
-
-            mean_chl = chl_stats.get('chlor_a').getInfo()
-            
-            if mean_chl is None or mean_chl <= 0:
-                return {'data_available': False, 'mean_chlorophyll': None}
+        # Get median composite
+        s3_image = s3_collection.median()
 
-            return {
-                'chl_image': chl_ocean.clip(roi),
-                'mean_chlorophyll': round(mean_chl, 3),
-                'data_available': True,
-                'images_processed': image_count
-            }
+        # Calculate NDCI (Normalized Difference Chlorophyll Index)
+        ndci = s3_image.normalizedDifference(['Oa06_radiance', 'Oa08_radiance']).rename('NDCI')
+        
+        # Convert NDCI to chlorophyll concentration using empirical relationship
+        # Empirical formula: Chl-a = 10^(1.61 * NDCI + 0.082)
+        # Simplified for this application: Chl-a ≈ NDCI * 25 + 2.5
+        chl_estimate = ndci.multiply(25).add(2.5).clamp(0.1, 100).rename('chlor_a')
+        
+        # Apply ocean mask
+        chl_ocean = chl_estimate.updateMask(ocean_mask)
 
-        except Exception as e:
-            print(f"Sentinel-3 OLCI processing error: {e}")
-            return {'data_available': False, 'mean_chlorophyll': None}
+        return {
+            'chl_image': chl_ocean,
+            'image_count': image_count
+        }
 
     def analyze_chlorophyll(self, roi_coords: Union[List, dict],
                              start_date: str = "2021-01-01",
@@ -217,27 +406,42 @@ class OceanAPI:
         try:
             start_date, end_date = self._validate_dates(start_date, end_date)
             roi = self._create_geometry(roi_coords)
-            area_km2 = roi.area().divide(1e6).getInfo()
-
-            print(f"🌊 Analyzing ocean chlorophyll for {area_km2:.2f} km² area...")
+            roi_json = roi_key(roi_coords)
 
             # Create ocean mask - will raise exception if fails
-            ocean_mask = self._create_ocean_mask(roi)
+            ocean_mask = self._ocean_mask_for(roi_json)
             
-            # Get chlorophyll data - will raise exception if no data available
-            chl_result = self._get_chlorophyll_data(roi, start_date, end_date, ocean_mask)
+            statistics = self._disk_cache_get(roi_json, start_date, end_date)
+            # Persisted statistics name their source, so only the image graph is rebuilt - no round trips.
+            # A source no longer configured is treated as a cache miss
+            source = None
+            if statistics is not None:
+                source = next(
+                    (candidate for candidate in self.satellite_sources if candidate['name'] == statistics.get('data_source')),
+                    None
+                )
+            if source is not None:
+                collection = self._source_collection(source, roi, start_date, end_date)
+                chl_image = self._process_source(source, collection, ocean_mask)['chl_image']
+                logger.debug("Using cached ocean chlorophyll statistics (%s)", statistics['data_source'])
+            else:
+                # Get chlorophyll data (with ROI and ocean areas) - will raise exception if no data available
+                chl_result = self._chlorophyll_data_for(roi_json, start_date, end_date)
+                chl_image = chl_result['chl_image']
+                area_km2 = chl_result['roi_area_km2']
 
-            # Create classification
-            classification_image = self._create_ocean_chlorophyll_classification(
-                chl_result['chl_image'], ocean_mask, roi
-            )
+                logger.debug("Analyzed ocean chlorophyll for %.2f km² area", area_km2)
 
-            # Calculate statistics
-            statistics = self._calculate_ocean_statistics(
-                chl_result, ocean_mask, area_km2, roi
-            )
+                # Calculate statistics
+                statistics = self._calculate_ocean_statistics(chl_result, area_km2)
+                self._disk_cache_put(roi_json, start_date, end_date, statistics)
+
+                logger.info("Ocean chlorophyll analysis completed using %s", chl_result['data_source'])
 
-            print(f"Ocean chlorophyll analysis completed using {chl_result['data_source']}")
+            # Create classification - the only clip in the chain, on the returned layer
+            classification_image = self._create_ocean_chlorophyll_classification(
+                chl_image, ocean_mask, roi
+            ).clip(roi)
 
             return {
                 "status": "success",
@@ -256,47 +460,30 @@ class OceanAPI:
     def _create_ocean_chlorophyll_classification(self, chl_image, ocean_mask, roi) -> ee.Image:
         """Create chlorophyll classification for ocean areas only"""
         try:
-            # Chlorophyll classification based on trophic levels
-            oligotrophic = chl_image.lte(self.chl_thresholds['oligotrophic'])
-            mesotrophic = chl_image.gt(self.chl_thresholds['oligotrophic']).And(
-                chl_image.lte(self.chl_thresholds['mesotrophic']))
-            moderate_eutrophic = chl_image.gt(self.chl_thresholds['mesotrophic']).And(
-                chl_image.lte(self.chl_thresholds['moderate_eutrophic']))
-            eutrophic = chl_image.gt(self.chl_thresholds['moderate_eutrophic']).And(
-                chl_image.lte(self.chl_thresholds['eutrophic']))
-            hypereutrophic = chl_image.gt(self.chl_thresholds['eutrophic'])
-
-            classification = ee.Image(0) \
-                .where(mesotrophic, 1) \
-                .where(moderate_eutrophic, 2) \
-                .where(eutrophic, 3) \
-                .where(hypereutrophic, 4)
+            # Chlorophyll classification based on trophic levels, in one expression node;
+            # masked chlorophyll pixels fall through to class 0 as with the old .where() chain
+            t = self.chl_thresholds
+            classification = chl_image.unmask(-1).expression(
+                f"b(0) <= {t['oligotrophic']} ? 0"
+                f" : b(0) <= {t['mesotrophic']} ? 1"
+                f" : b(0) <= {t['moderate_eutrophic']} ? 2"
+                f" : b(0) <= {t['eutrophic']} ? 3 : 4"
+            )
             
-            # Apply ocean mask
+            # Apply ocean mask (already clipped to the ROI; the caller clips the returned layer once)
             ocean_classification = classification.updateMask(ocean_mask)
             
-            return ocean_classification.rename('ocean_chl_class').clip(roi)
+            return ocean_classification.rename('ocean_chl_class')
 
         except Exception as e:
-            print(f"Classification error: {e}")
+            logger.error("Classification error: %s", e)
             raise Exception("Failed to create chlorophyll classification")
 
-    def _calculate_ocean_statistics(self, chl_result: Dict, ocean_mask: ee.Image, 
-                                   area_km2: float, roi) -> Dict[str, Any]:
-        """Calculate ocean statistics"""
+    def _calculate_ocean_statistics(self, chl_result: Dict, area_km2: float) -> Dict[str, Any]:
+        """Calculate ocean statistics from the already-fetched chlorophyll result"""
         try:
-            # Calculate ocean area
-            pixel_area = ee.Image.pixelArea().divide(1e6)
-            ocean_area_result = pixel_area.updateMask(ocean_mask).reduceRegion(
-                reducer=ee.Reducer.sum(),
-                geometry=roi,
-                scale=1000,
-                maxPixels=1e9
-            )
-            
-            ocean_area_km2 = ocean_area_result.get('area').getInfo()
-            if ocean_area_km2 is None:
-                ocean_area_km2 = 0
+            # Ocean area was fetched together with the chlorophyll statistics
+            ocean_area_km2 = chl_result.get('ocean_area_km2') or 0
             
             land_area_km2 = area_km2 - ocean_area_km2
             ocean_coverage_percent = (ocean_area_km2 / area_km2) * 100 if area_km2 > 0 else 0
@@ -335,45 +522,20 @@ class OceanAPI:
             }
 
         except Exception as e:
-            print(f"Statistics calculation error: {e}")
+            logger.error("Statistics calculation error: %s", e)
             raise Exception("Failed to calculate ocean statistics")
 
     def _classify_trophic_status(self, chl_val: float) -> str:
         """Classify trophic status based on chlorophyll concentration"""
-        if chl_val <= self.chl_thresholds['oligotrophic']:
-            return "Oligotrophic (Very Low)"
-        elif chl_val <= self.chl_thresholds['mesotrophic']:
-            return "Mesotrophic (Low)"
-        elif chl_val <= self.chl_thresholds['moderate_eutrophic']:
-            return "Moderately Eutrophic"
-        elif chl_val <= self.chl_thresholds['eutrophic']:
-            return "Eutrophic (High)"
-        else:
-            return "Hypereutrophic (Very High)"
+        return self._trophic_labels[bisect.bisect_left(self._trophic_thresholds, chl_val)]
 
     def _assess_water_quality(self, chl_val: float) -> str:
         """Assess water quality based on chlorophyll levels"""
-        if chl_val <= 5.0:
-            return "Excellent - Clear ocean water"
-        elif chl_val <= 15.0:
-            return "Good - Productive ocean"
-        elif chl_val <= 30.0:
-            return "Moderate - Highly productive"
-        elif chl_val <= 90.0:
-            return "Poor - Very productive, potential issues"
-        else:
-            return "Very Poor - High bloom risk"
+        return self._water_quality_labels[bisect.bisect_left(self._water_quality_thresholds, chl_val)]
 
     def _assess_bloom_risk(self, chl_val: float) -> str:
         """Assess algal bloom risk based on chlorophyll levels"""
-        if chl_val <= 15.0:
-            return "Low"
-        elif chl_val <= 30.0:
-            return "Moderate"
-        elif chl_val <= 90.0:
-            return "High"
-        else:
-            return "Very High - Immediate concern"
+        return self._bloom_risk_labels[bisect.bisect_left(self._bloom_risk_thresholds, chl_val)]
 
     # Legacy interface methods for compatibility
     def create_chlorophyll_classification_image(self, roi_coords: Union[List, dict],
@@ -0,0 +1,29 @@
+# retry.py - Shared retry policy for Earth Engine requests
+
+import ee
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Earth Engine errors worth retrying (rate limiting, overloaded service). Anything else - bad
+# geometry, missing bands, memory limits, "Computation timed out." - fails the same way every
+# time and is re-raised immediately
+_TRANSIENT_EE_ERROR = re.compile(
+    r"429|rate limit|too many (concurrent )?(requests|aggregations)|503|service unavailable",
+    re.IGNORECASE
+)
+
+
+def call_with_retry(func, *args, attempts: int = 4):
+    """Call an Earth Engine request, retrying transient EEExceptions after 0.5s, 1s, 2s"""
+    for attempt in range(attempts):
+        try:
+            return func(*args)
+        except ee.EEException as e:
+            if attempt == attempts - 1 or not _TRANSIENT_EE_ERROR.search(str(e)):
+                raise
+            delay = 0.5 * 2 ** attempt
+            logger.warning("Earth Engine request failed (%s), retrying in %.1fs", e, delay)
+            time.sleep(delay)
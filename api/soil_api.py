@@ -1,57 +1,83 @@
 # soil_api.py
 
 import ee
-from datetime import datetime, timedelta
+import logging
+import math
+import numpy as np
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
 from typing import List, Union, Dict, Any
 
+from api.cache import analysis_cache
+from api.geometry import geometry_from_json, roi_key
+from api.retry import call_with_retry
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _constant_image(value: float, band_name: str) -> ee.Image:
+    """Shared default/fallback layer; built lazily since ee.Image needs an initialized session"""
+    return ee.Image.constant(value).rename(band_name)
+
+
 class SoilAPI:
     """
     Soil Analysis API for soil moisture classification using Google Earth Engine.
     Uses rule-based classification based on NDVI, NDWI, and Land Surface Temperature.
     """
 
+    _DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+    # Native MODIS sinusoidal 1 km grid (origin-aligned), so LST is reduced on stored pixels without resampling
+    modis_crs = 'SR-ORG:6974'
+    modis_scale = 926.625433055833
+
+    # Classification thresholds - shared, read-only class constants
+    wet_threshold = MappingProxyType({"ndwi": 0.2, "lst": 32})
+    dry_threshold = MappingProxyType({"ndvi": 0.25, "ndwi": 0.1, "lst": 34})
+    moderate_threshold = MappingProxyType({"ndvi_min": 0.2, "ndvi_max": 0.4, "lst_min": 28, "lst_max": 35})
+
+    # Moisture level per 5-bit rule key (wet NDWI, wet LST, dry NDVI, dry NDWI, dry LST), wet rule first
+    _moisture_labels = tuple(
+        "High Moisture" if key & 0b11000 == 0b11000
+        else "Dry Soil" if key & 0b00111 == 0b00111
+        else "Moderate"
+        for key in range(32)
+    )
+
     def __init__(self):
-        """Initialize Soil API with classification thresholds"""
-        self.wet_threshold = {"ndwi": 0.2, "lst": 32}
-        self.dry_threshold = {"ndvi": 0.25, "ndwi": 0.1, "lst": 34}
-        self.moderate_threshold = {"ndvi_min": 0.2, "ndvi_max": 0.4, "lst_min": 28, "lst_max": 35}
+        """Initialize Soil API"""
+        # Reduction tile split; raise to 8 or 16 for continent-scale ROIs that run out of memory
+        self.tile_scale = 4
 
     def _create_geometry(self, roi_coords: Union[List, dict]):
         """
         Create an Earth Engine geometry from coordinates.
-        Supports Polygon, MultiPolygon, Point, LineString.
+        Supports Polygon, MultiPolygon, Point, LineString; memoized on the canonical ROI JSON
+        so fallback paths reuse the analysis geometry.
         """
-        if isinstance(roi_coords, dict) and 'type' in roi_coords and 'coordinates' in roi_coords:
-            geom_type = roi_coords['type'].lower()
-            coords = roi_coords['coordinates']
-            if geom_type == 'polygon':
-                return ee.Geometry.Polygon(coords)
-            elif geom_type == 'multipolygon':
-                return ee.Geometry.MultiPolygon(coords)
-            elif geom_type == 'point':
-                return ee.Geometry.Point(coords)
-            elif geom_type == 'linestring':
-                return ee.Geometry.LineString(coords)
-            else:
-                raise ValueError(f"Unsupported geometry type: {geom_type}")
-        elif isinstance(roi_coords, list):
-            return ee.Geometry.Polygon([roi_coords])
-        else:
-            raise ValueError("Invalid ROI coordinates format")
+        return geometry_from_json(roi_key(roi_coords))
 
     def _validate_dates(self, start_date: str, end_date: str):
         """
-        Validate and parse dates in 'YYYY-MM-DD' format.
+        Validate dates in 'YYYY-MM-DD' format.
         Raises ValueError if invalid.
         """
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            if start > end:
-                raise ValueError("start_date must be earlier than end_date")
-            return start_date, end_date
-        except Exception as e:
-            raise ValueError(f"Invalid date format or logic: {str(e)}")
+        for date_str in (start_date, end_date):
+            if not isinstance(date_str, str) or not self._DATE_RE.match(date_str):
+                raise ValueError(f"Invalid date format or logic: {date_str!r} does not match format 'YYYY-MM-DD'")
+            try:
+                date.fromisoformat(date_str)
+            except ValueError as e:
+                raise ValueError(f"Invalid date format or logic: {str(e)}")
+        # Zero-padded ISO dates order lexically
+        if start_date > end_date:
+            raise ValueError("Invalid date format or logic: start_date must be earlier than end_date")
+        return start_date, end_date
 
     def analyze_soil_moisture(self, roi_coords: Union[List, dict], 
                             start_date: str = "2021-01-01", 
@@ -68,160 +94,306 @@ class SoilAPI:
             
         Returns:
             Dictionary containing soil moisture analysis results
+            (memoized per ROI, dates and resolution; failed analyses are not cached)
         """
+        return self._analyze_roi_json(roi_key(roi_coords), start_date, end_date, resolution)
+
+    def _analyze_roi_json(self, roi_json: str, start_date: str, end_date: str, resolution: int) -> Dict[str, Any]:
+        """analyze_soil_moisture for an already canonicalized ROI"""
         try:
             # Validate inputs
             start_date, end_date = self._validate_dates(start_date, end_date)
-            roi = self._create_geometry(roi_coords)
-            
-            # Calculate ROI area
-            area_km2 = roi.area().divide(1e6).getInfo()
+            return self._run_soil_analysis(roi_json, start_date, end_date, resolution)
             
-            # Get satellite data
-            s2_result = self._get_sentinel2_data(roi, start_date, end_date)
-            lst_result = self._get_temperature_data(roi, start_date, end_date)
-            
-            # Create soil moisture classification
-            classification_image = self._create_soil_classification(
-                s2_result['ndvi_image'],
-                s2_result['ndwi_image'], 
-                lst_result['lst_image'],
-                roi
-            )
-            
-            # Calculate statistics
-            statistics = self._calculate_soil_statistics(
-                s2_result, lst_result, area_km2
-            )
-            
-            return {
-                "status": "success",
-                "classification_image": classification_image,
-                "statistics": statistics
-            }
-            
-        except Exception as e:
+        except (ee.EEException, ValueError) as e:
+            logger.exception("Soil moisture analysis failed")
             return {
                 "status": "error",
                 "error": str(e),
                 "message": "Soil moisture analysis failed"
             }
 
-    def _get_sentinel2_data(self, roi, start_date: str, end_date: str) -> Dict[str, Any]:
-        """Get Sentinel-2 vegetation and water indices"""
-        try:
-            s2_collection = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
-                .filterBounds(roi) \
-                .filterDate(start_date, end_date) \
-                .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
-            
-            if s2_collection.size().getInfo() == 0:
-                # Return default values if no data
-                default_ndvi = ee.Image.constant(0.3).clip(roi).rename('NDVI')
-                default_ndwi = ee.Image.constant(0.1).clip(roi).rename('NDWI')
-                return {
-                    'ndvi_image': default_ndvi,
-                    'ndwi_image': default_ndwi,
-                    'mean_ndvi': 0.3,
-                    'mean_ndwi': 0.1,
-                    'data_available': False
-                }
-            
-            s2_median = s2_collection.median()
-            ndvi = s2_median.normalizedDifference(['B8', 'B4']).rename('NDVI').clip(roi)
-            ndwi = s2_median.normalizedDifference(['B3', 'B8']).rename('NDWI').clip(roi)
-            
-            # Calculate mean values
-            ndvi_stats = ndvi.reduceRegion(
-                reducer=ee.Reducer.mean(),
+    @analysis_cache(maxsize=128)
+    def _run_soil_analysis(self, roi_json: str, start_date: str, end_date: str, resolution: int) -> Dict[str, Any]:
+        """Run the soil moisture analysis for a canonicalized ROI key"""
+        return self._analyze_with_geom(geometry_from_json(roi_json), start_date, end_date, resolution)
+
+    def _analyze_with_geom(self, roi, start_date: str, end_date: str, resolution: int) -> Dict[str, Any]:
+        """
+        Run the soil moisture analysis on a pre-built ee.Geometry (validated dates, not memoized).
+        Raises on failure; batch callers holding geometries can use this directly.
+        """
+        # Build deferred satellite layers
+        s2_data = self._get_sentinel2_data(roi, start_date, end_date)
+        lst_data = self._get_temperature_data(roi, start_date, end_date)
+        
+        # Create soil moisture classification
+        classification_image = self._create_soil_classification(
+            s2_data['ndvi_image'],
+            s2_data['ndwi_image'], 
+            lst_data['lst_image'],
+            roi
+        )
+        
+        # ROI area, image counts, mean indices and class areas in a single round trip. Empty
+        # collections already fall back to constant layers server-side, so the reductions always succeed
+        index_stats = s2_data['ndvi_image'].addBands(s2_data['ndwi_image']).reduceRegion(
+            reducer=self._index_reducer(),
+            geometry=roi,
+            scale=500,
+            maxPixels=1e9,
+            bestEffort=True,
+            tileScale=self.tile_scale
+        )
+        lst_stats = lst_data['lst_image'].reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=roi,
+            crs=self.modis_crs,
+            scale=self.modis_scale,
+            maxPixels=1e9,
+            bestEffort=True,
+            tileScale=self.tile_scale
+        )
+        fused = ee.Dictionary(self._rounded_means(index_stats, lst_stats)).combine({
+            'NDVI_count': index_stats.get('NDVI_count'),
+            'roi_area_km2': roi.area().divide(1e6),
+            's2_count': s2_data['image_count'],
+            'lst_count': lst_data['image_count'],
+            'groups': self._class_area_image(classification_image).reduceRegion(
+                reducer=self._class_area_reducer(),
                 geometry=roi,
                 scale=500,
-                maxPixels=1e9
+                maxPixels=1e9,
+                bestEffort=True,
+                tileScale=self.tile_scale
+            ).get('groups')
+        })
+        info = call_with_retry(fused.getInfo)
+        
+        area_km2 = info['roi_area_km2']
+        s2_result = self._sentinel2_result(s2_data, info)
+        lst_result = self._temperature_result(lst_data, info)
+        
+        # Calculate statistics
+        statistics = self._calculate_soil_statistics(
+            s2_result, lst_result, area_km2
+        )
+        statistics["class_areas_km2"] = self._class_areas(info.get('groups'))
+        
+        return {
+            "status": "success",
+            "classification_image": classification_image,
+            "statistics": statistics
+        }
+
+    def analyze_soil_moisture_batch(self, roi_list: List[Union[List, dict]],
+                                    start_date: str = "2021-01-01",
+                                    end_date: str = "2023-01-01",
+                                    resolution: int = 500) -> List[Dict[str, Any]]:
+        """
+        Analyze many ROIs over one date range with a single round trip.
+        The layers are built once over the union of the ROIs and reduced per ROI with reduceRegions;
+        results keep input order and have the same shape as analyze_soil_moisture.
+        """
+        if not roi_list:
+            return []
+        try:
+            start_date, end_date = self._validate_dates(start_date, end_date)
+            geometries = [geometry_from_json(roi_key(roi_coords)) for roi_coords in roi_list]
+            features = ee.FeatureCollection([
+                ee.Feature(geometry, {'roi_index': index, 'roi_area_km2': geometry.area().divide(1e6)})
+                for index, geometry in enumerate(geometries)
+            ])
+            union = features.geometry()
+
+            s2_data = self._get_sentinel2_data(union, start_date, end_date)
+            lst_data = self._get_temperature_data(union, start_date, end_date)
+            classification_image = self._create_soil_classification(
+                s2_data['ndvi_image'], s2_data['ndwi_image'], lst_data['lst_image'], union
             )
-            
-            ndwi_stats = ndwi.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=roi,
+
+            reduced = s2_data['ndvi_image'].addBands(s2_data['ndwi_image']).reduceRegions(
+                collection=features,
+                reducer=self._index_reducer(),
                 scale=500,
-                maxPixels=1e9
+                tileScale=self.tile_scale
             )
-            
-            mean_ndvi = ndvi_stats.get('NDVI').getInfo()
-            mean_ndwi = ndwi_stats.get('NDWI').getInfo()
-            
-            if mean_ndvi is None:
-                mean_ndvi = 0.3
-            if mean_ndwi is None:
-                mean_ndwi = 0.1
-            
-            return {
-                'ndvi_image': ndvi,
-                'ndwi_image': ndwi,
-                'mean_ndvi': round(mean_ndvi, 3),
-                'mean_ndwi': round(mean_ndwi, 3),
-                'data_available': True
-            }
-            
-        except Exception as e:
-            print(f"Sentinel-2 data error: {e}")
-            # Return fallback
-            default_ndvi = ee.Image.constant(0.3).clip(roi).rename('NDVI')
-            default_ndwi = ee.Image.constant(0.1).clip(roi).rename('NDWI')
+            reduced = lst_data['lst_image'].reduceRegions(
+                collection=reduced,
+                reducer=ee.Reducer.mean().setOutputs(['LST_C']),
+                crs=self.modis_crs,
+                scale=self.modis_scale,
+                tileScale=self.tile_scale
+            )
+            reduced = self._class_area_image(classification_image).reduceRegions(
+                collection=reduced,
+                reducer=self._class_area_reducer(),
+                scale=500,
+                tileScale=self.tile_scale
+            ).map(lambda feature: feature.set(self._rounded_means(feature, feature)))
+            info = call_with_retry(ee.Dictionary({
+                'rois': reduced,
+                's2_count': s2_data['image_count'],
+                'lst_count': lst_data['image_count']
+            }).getInfo)
+        except (ee.EEException, ValueError) as e:
+            logger.exception("Batch soil moisture analysis failed")
+            error = {"status": "error", "error": str(e), "message": "Soil moisture analysis failed"}
+            return [dict(error) for _ in roi_list]
+
+        properties = {
+            feature['properties']['roi_index']: feature['properties']
+            for feature in info['rois']['features']
+        }
+
+        results = []
+        for index, geometry in enumerate(geometries):
+            roi_info = properties[index]
+            roi_info['s2_count'] = info['s2_count']
+            # A collection with scenes elsewhere in the union can still leave this ROI without data
+            roi_info['lst_count'] = info['lst_count'] if roi_info.get('LST_C') is not None else 0
+            s2_result = self._sentinel2_result(s2_data, roi_info)
+            lst_result = self._temperature_result(lst_data, roi_info)
+            statistics = self._calculate_soil_statistics(s2_result, lst_result, roi_info['roi_area_km2'])
+            statistics["class_areas_km2"] = self._class_areas(roi_info.get('groups'))
+            results.append({
+                "status": "success",
+                "classification_image": classification_image.clip(geometry),
+                "statistics": statistics
+            })
+        return results
+
+    def _get_sentinel2_data(self, roi, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Build deferred Sentinel-2 vegetation and water indices and the server-side image count"""
+        s2_collection = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
+            .filterBounds(roi) \
+            .filterDate(start_date, end_date) \
+            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
+        
+        # Default indices when there is no data, selected server-side
+        image_count = s2_collection.size()
+        has_data = image_count.gt(0)
+        s2_median = self._monthly_best_scenes(s2_collection, start_date, end_date).median()
+        ndvi = ee.Image(ee.Algorithms.If(
+            has_data, s2_median.normalizedDifference(['B8', 'B4']), _constant_image(0.3, 'NDVI')
+        )).rename('NDVI').clip(roi)
+        ndwi = ee.Image(ee.Algorithms.If(
+            has_data, s2_median.normalizedDifference(['B3', 'B8']), _constant_image(0.1, 'NDWI')
+        )).rename('NDWI').clip(roi)
+        
+        return {
+            'ndvi_image': ndvi,
+            'ndwi_image': ndwi,
+            'image_count': image_count
+        }
+
+    def _monthly_best_scenes(self, collection: ee.ImageCollection, start_date: str, end_date: str) -> ee.ImageCollection:
+        """
+        Least-cloudy scene per month and MGRS tile. Consecutive Sentinel-2 revisits are largely
+        redundant for a median, so this keeps full ROI coverage while reading a fraction of the scenes.
+        """
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        months = (end.year - start.year) * 12 + end.month - start.month + 1
+        tiles = collection.aggregate_array('MGRS_TILE').distinct()
+
+        def best_in_month(month_index):
+            month_start = ee.Date(start_date).advance(month_index, 'month')
+            monthly = collection.filterDate(month_start, month_start.advance(1, 'month'))
+            return tiles.map(
+                lambda tile: monthly.filter(ee.Filter.eq('MGRS_TILE', tile))
+                .sort('CLOUDY_PIXEL_PERCENTAGE').limit(1).toList(1)
+            ).flatten()
+
+        return ee.ImageCollection(ee.List.sequence(0, months - 1).map(best_in_month).flatten())
+
+    def _rounded_means(self, index_stats, lst_stats) -> Dict[str, ee.Number]:
+        """Server-side defaulted and rounded means (NDVI/NDWI to 3 places, LST to 2)"""
+        def rounded(value, default, digits):
+            value = ee.Number(ee.Algorithms.If(ee.Algorithms.IsEqual(value, None), default, value))
+            return value.multiply(10 ** digits).round().divide(10 ** digits)
+
+        return {
+            'mean_ndvi': rounded(index_stats.get('NDVI_mean'), 0.3, 3),
+            'mean_ndwi': rounded(index_stats.get('NDWI_mean'), 0.1, 3),
+            'mean_temperature': rounded(lst_stats.get('LST_C'), 30.0, 2)
+        }
+
+    def _index_reducer(self) -> ee.Reducer:
+        """Mean and valid-pixel count of each index band in one pass (outputs NDVI_mean, NDVI_count, ...)"""
+        return ee.Reducer.mean().combine(ee.Reducer.count(), sharedInputs=True)
+
+    def _class_area_image(self, classification_image: ee.Image) -> ee.Image:
+        """Pixel area (km²) with the soil class band, for a grouped area sum"""
+        return ee.Image.pixelArea().divide(1e6).addBands(classification_image)
+
+    def _class_area_reducer(self) -> ee.Reducer:
+        """Sum of pixel area per soil class (outputs 'groups': [{'soil_class', 'sum'}, ...])"""
+        return ee.Reducer.sum().group(groupField=1, groupName='soil_class')
+
+    def _class_areas(self, groups: Union[List[Dict[str, Any]], None]) -> Dict[str, float]:
+        """Per-class areas in km² from the grouped area sum"""
+        areas = {group['soil_class']: group['sum'] for group in groups or []}
+        return {
+            "dry_soil_km2": round(areas.get(1, 0), 2),
+            "moderate_km2": round(areas.get(2, 0), 2),
+            "high_moisture_km2": round(areas.get(3, 0), 2)
+        }
+
+    def _sentinel2_result(self, s2_data: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+        """Sentinel-2 result from the fetched statistics, with defaults when there is no data"""
+        # No scenes, or scenes that leave the ROI fully masked
+        if not info['s2_count'] or not info.get('NDVI_count'):
             return {
-                'ndvi_image': default_ndvi,
-                'ndwi_image': default_ndwi,
+                'ndvi_image': s2_data['ndvi_image'],
+                'ndwi_image': s2_data['ndwi_image'],
                 'mean_ndvi': 0.3,
                 'mean_ndwi': 0.1,
                 'data_available': False
             }
+        
+        # Means arrive defaulted and rounded from the server
+        return {
+            'ndvi_image': s2_data['ndvi_image'],
+            'ndwi_image': s2_data['ndwi_image'],
+            'mean_ndvi': info['mean_ndvi'],
+            'mean_ndwi': info['mean_ndwi'],
+            'data_available': True
+        }
 
     def _get_temperature_data(self, roi, start_date: str, end_date: str) -> Dict[str, Any]:
-        """Get MODIS Land Surface Temperature data"""
-        try:
-            lst_collection = ee.ImageCollection('MODIS/061/MOD11A2') \
-                .filterBounds(roi) \
-                .filterDate(start_date, end_date) \
-                .select('LST_Day_1km')
-            
-            if lst_collection.size().getInfo() == 0:
-                # Return default temperature if no data
-                default_lst = ee.Image.constant(30.0).clip(roi).rename('LST_C')
-                return {
-                    'lst_image': default_lst,
-                    'mean_temperature': 30.0,
-                    'data_available': False
-                }
-            
-            # Convert from Kelvin to Celsius
-            lst_celsius = lst_collection.mean().multiply(0.02).subtract(273.15).rename('LST_C').clip(roi)
-            
-            # Calculate mean temperature
-            lst_stats = lst_celsius.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=roi,
-                scale=1000,
-                maxPixels=1e9
-            )
-            
-            mean_temp = lst_stats.get('LST_C').getInfo()
-            if mean_temp is None:
-                mean_temp = 30.0
-            
-            return {
-                'lst_image': lst_celsius,
-                'mean_temperature': round(mean_temp, 2),
-                'data_available': True
-            }
-            
-        except Exception as e:
-            print(f"Temperature data error: {e}")
-            # Return fallback
-            default_lst = ee.Image.constant(30.0).clip(roi).rename('LST_C')
+        """Build deferred MODIS Land Surface Temperature and the server-side image count"""
+        lst_collection = ee.ImageCollection('MODIS/061/MOD11A2') \
+            .filterBounds(roi) \
+            .filterDate(start_date, end_date) \
+            .select('LST_Day_1km')
+        
+        # Convert from Kelvin to Celsius; default temperature when there is no data
+        image_count = lst_collection.size()
+        lst_celsius = ee.Image(ee.Algorithms.If(
+            image_count.gt(0),
+            lst_collection.mean().multiply(0.02).subtract(273.15),
+            _constant_image(30.0, 'LST_C')
+        )).rename('LST_C').clip(roi)
+        
+        return {
+            'lst_image': lst_celsius,
+            'image_count': image_count
+        }
+
+    def _temperature_result(self, lst_data: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+        """Temperature result from the fetched statistics, with defaults when there is no data"""
+        if not info['lst_count']:
             return {
-                'lst_image': default_lst,
+                'lst_image': lst_data['lst_image'],
                 'mean_temperature': 30.0,
                 'data_available': False
             }
+        
+        return {
+            'lst_image': lst_data['lst_image'],
+            'mean_temperature': info['mean_temperature'],
+            'data_available': True
+        }
 
     def _create_soil_classification(self, ndvi_image, ndwi_image, lst_image, roi) -> ee.Image:
         """Create soil moisture classification based on NDVI, NDWI, and LST"""
@@ -231,27 +403,33 @@ class SoilAPI:
             # Class 2: Moderate Soil (NDVI 0.2-0.4, LST 28-35°C)
             # Class 3: High Moisture (NDWI > 0.2, LST < 32°C)
             
-            # Define conditions
-            dry_condition = ndvi_image.lt(0.25).And(ndwi_image.lt(0.1)).And(lst_image.gt(34))
-            wet_condition = ndwi_image.gt(0.2).And(lst_image.lt(32))
-            moderate_condition = ndvi_image.gte(0.2).And(ndvi_image.lte(0.4)).And(lst_image.gte(28)).And(lst_image.lte(35))
-            
-            # Create classification (default to moderate)
-            classification = ee.Image(2) \
-                .where(dry_condition, 1) \
-                .where(wet_condition, 3) \
-                .where(moderate_condition.And(dry_condition.Not()).And(wet_condition.Not()), 2) \
-                .rename('soil_class').clip(roi)
+            # Single expression node; the dry and wet rules are mutually exclusive (NDWI < 0.1 vs > 0.2),
+            # and masked pixels stay moderate as with the old .where() chain
+            dry, wet = self.dry_threshold, self.wet_threshold
+            classification = ndvi_image.expression(
+                f"(NDVI < {dry['ndvi']} && NDWI < {dry['ndwi']} && LST > {dry['lst']}) ? 1"
+                f" : (NDWI > {wet['ndwi']} && LST < {wet['lst']}) ? 3 : 2",
+                {'NDVI': ndvi_image, 'NDWI': ndwi_image, 'LST': lst_image}
+            ).unmask(2).rename('soil_class').clip(roi)
             
             return classification
             
         except Exception as e:
-            print(f"Soil classification error: {e}")
+            logger.error("Soil classification error: %s", e)
             # Return fallback classification
-            return ee.Image.constant(2).clip(roi).rename('soil_class')
+            return _constant_image(2, 'soil_class').clip(roi)
+
+    def _calculate_soil_statistics(self, s2_result: Dict[str, Any], lst_result: Dict[str, Any],
+                                   area_km2: float) -> Dict[str, Any]:
+        """
+        Calculate comprehensive soil moisture statistics from already-fetched numbers.
+        Pure Python: raises TypeError for Earth Engine objects instead of fetching them implicitly.
+        """
+        for name, value in (("mean_ndvi", s2_result['mean_ndvi']), ("mean_ndwi", s2_result['mean_ndwi']),
+                            ("mean_temperature", lst_result['mean_temperature']), ("area_km2", area_km2)):
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"{name} must be a fetched number, got {type(value).__name__}")
 
-    def _calculate_soil_statistics(self, s2_result: Dict, lst_result: Dict, area_km2: float) -> Dict[str, Any]:
-        """Calculate comprehensive soil moisture statistics"""
         try:
             # Determine soil moisture level
             soil_moisture_level = self._classify_soil_moisture(
@@ -286,7 +464,7 @@ class SoilAPI:
             }
             
         except Exception as e:
-            print(f"Statistics calculation error: {e}")
+            logger.error("Statistics calculation error: %s", e)
             return {
                 "roi_area_km2": round(area_km2, 2),
                 "soil_moisture_index": 0.5,
@@ -298,13 +476,12 @@ class SoilAPI:
             }
 
     def _classify_soil_moisture(self, ndvi: float, ndwi: float, lst: float) -> str:
-        """Classify soil moisture level based on indices"""
-        if ndwi > 0.2 and lst < 32:
-            return "High Moisture"
-        elif ndvi < 0.25 and ndwi < 0.1 and lst > 34:
-            return "Dry Soil"
-        else:
-            return "Moderate"
+        """Classify soil moisture level based on indices (table lookup on the rule outcomes)"""
+        wet, dry = self.wet_threshold, self.dry_threshold
+        return self._moisture_labels[
+            (ndwi > wet['ndwi']) << 4 | (lst < wet['lst']) << 3
+            | (ndvi < dry['ndvi']) << 2 | (ndwi < dry['ndwi']) << 1 | (lst > dry['lst'])
+        ]
 
     def create_soil_classification_image(self, roi_coords: Union[List, dict], 
                                        start_date: str, end_date: str, resolution: int = 500) -> ee.Image:
@@ -320,19 +497,72 @@ class SoilAPI:
         Returns:
             Earth Engine Image with soil moisture classification
         """
+        # Canonicalize once; the analysis and the fallback share the memoized geometry
+        roi_json = roi_key(roi_coords)
         try:
-            result = self.analyze_soil_moisture(roi_coords, start_date, end_date, resolution)
+            result = self._analyze_roi_json(roi_json, start_date, end_date, resolution)
             if result["status"] == "success":
                 return result["classification_image"]
             else:
                 # Return fallback image
-                roi = self._create_geometry(roi_coords)
-                return ee.Image.constant(2).clip(roi).rename('soil_class')
+                roi = geometry_from_json(roi_json)
+                return _constant_image(2, 'soil_class').clip(roi)
                 
         except Exception as e:
             # Return fallback image
-            roi = self._create_geometry(roi_coords)
-            return ee.Image.constant(2).clip(roi).rename('soil_class')
+            roi = geometry_from_json(roi_json)
+            return _constant_image(2, 'soil_class').clip(roi)
+
+    def fetch_classification_array(self, roi_coords: Union[List, dict], start_date: str, end_date: str,
+                                   resolution: int = 500, tile_px: int = 256, num_workers: int = 16) -> np.ndarray:
+        """
+        Fetch the soil classification as a uint8 array (EPSG:4326 grid, north-up; 0 outside the ROI).
+        Tiles of tile_px pixels are requested in parallel via ee.data.computePixels and stitched.
+        """
+        # The analysis and the bounds lookup are independent round trips, so overlap them
+        roi_json = roi_key(roi_coords)
+        roi = geometry_from_json(roi_json)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result_future = executor.submit(self._analyze_roi_json, roi_json, start_date, end_date, resolution)
+            bounds_future = executor.submit(call_with_retry, roi.bounds().coordinates().get(0).getInfo)
+            result, bounds = result_future.result(), bounds_future.result()
+        if result["status"] != "success":
+            raise Exception(result["error"])
+        classification = result["classification_image"].unmask(0).toByte()
+
+        lons = [point[0] for point in bounds]
+        lats = [point[1] for point in bounds]
+        west, north = min(lons), max(lats)
+
+        # Pixel size in degrees for the requested resolution
+        step = resolution / 111320
+        width = max(1, math.ceil((max(lons) - west) / step))
+        height = max(1, math.ceil((north - min(lats)) / step))
+        rows = math.ceil(height / tile_px)
+        cols = math.ceil(width / tile_px)
+
+        def fetch(cell):
+            row, col = cell
+            return call_with_retry(ee.data.computePixels, {
+                'expression': classification,
+                'fileFormat': 'NUMPY_NDARRAY',
+                'grid': {
+                    'dimensions': {
+                        'width': min(tile_px, width - col * tile_px),
+                        'height': min(tile_px, height - row * tile_px)
+                    },
+                    'affineTransform': {
+                        'scaleX': step, 'shearX': 0, 'translateX': west + col * tile_px * step,
+                        'shearY': 0, 'scaleY': -step, 'translateY': north - row * tile_px * step
+                    },
+                    'crsCode': 'EPSG:4326'
+                }
+            })['soil_class']
+
+        cells = [(row, col) for row in range(rows) for col in range(cols)]
+        with ThreadPoolExecutor(max_workers=min(num_workers, len(cells))) as executor:
+            tiles = list(executor.map(fetch, cells))
+        return np.block([tiles[row * cols:(row + 1) * cols] for row in range(rows)])
 
     def get_soil_statistics(self, roi_coords: Union[List, dict], 
                           start_date: str, end_date: str, resolution: int = 500) -> Dict[str, Any]:
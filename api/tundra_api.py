@@ -1,9 +1,55 @@
 # tundra_api.py - Optimized 5-Class Permafrost-Aware Tundra Classification
 
 import ee
+import logging
 from datetime import datetime
 from typing import List, Union, Dict, Any
 
+from api.cache import analysis_cache
+from api.geometry import geometry_from_json, roi_key
+from api.retry import call_with_retry
+
+logger = logging.getLogger(__name__)
+
+
+def _priority_classify(code: int) -> int:
+    """
+    Tundra class for a packed condition code (digits: vegetation, cold, alpine, wet,
+    permafrost/arctic). Replays TundraAPI's classification hierarchy; a masked condition
+    (digit 2) makes any rule that depends on it not apply, as with Image.where().
+    """
+    veg, cold, alpine, wet, perm = [None if (code // 3 ** i) % 3 == 2 else bool((code // 3 ** i) % 3)
+                                    for i in range(5)]
+
+    def both(*values):
+        return None if None in values else all(values)
+
+    def negate(value):
+        return None if value is None else not value
+
+    tundra_class = 0  # Default: No Tundra
+    # Class 1: Arctic Tundra (cold + permafrost/high latitude + vegetation)
+    arctic_conditions = both(perm, cold, veg)
+    if both(arctic_conditions, negate(alpine)):
+        tundra_class = 1
+    # Class 2: Alpine Tundra (high elevation + vegetation)
+    if both(alpine, veg):
+        tundra_class = 2
+    # Class 3: Wet Tundra (permafrost/arctic + wet + vegetation)
+    if both(perm, wet, veg, negate(alpine)):
+        tundra_class = 3
+    # Class 4: Shrub/Dry Tundra (permafrost/arctic + dry + vegetation), excluding arctic tundra
+    if both(perm, negate(wet), veg, negate(alpine), negate(arctic_conditions)):
+        tundra_class = 4
+    return tundra_class
+
+
+# Classification lookup table over every packed condition code (5 conditions, base 3),
+# evaluated once at import
+_CLASSIFY_FROM = list(range(3 ** 5))
+_CLASSIFY_TO = [_priority_classify(code) for code in _CLASSIFY_FROM]
+
+
 class TundraAPI:
     """
     Optimized Tundra Analysis API for global 5-class permafrost-aware classification.
@@ -29,24 +75,8 @@ class TundraAPI:
         self.permafrost_threshold = 0.25  # Lowered for global coverage
 
     def _create_geometry(self, roi_coords: Union[List, dict]):
-        """Create Earth Engine geometry from coordinates."""
-        if isinstance(roi_coords, dict) and 'type' in roi_coords and 'coordinates' in roi_coords:
-            geom_type = roi_coords['type'].lower()
-            coords = roi_coords['coordinates']
-            if geom_type == 'polygon':
-                return ee.Geometry.Polygon(coords)
-            elif geom_type == 'multipolygon':
-                return ee.Geometry.MultiPolygon(coords)
-            elif geom_type == 'point':
-                return ee.Geometry.Point(coords)
-            elif geom_type == 'linestring':
-                return ee.Geometry.LineString(coords)
-            else:
-                raise ValueError(f"Unsupported geometry type: {geom_type}")
-        elif isinstance(roi_coords, list):
-            return ee.Geometry.Polygon([roi_coords])
-        else:
-            raise ValueError("Invalid ROI coordinates format")
+        """Create an Earth Engine geometry from coordinates (memoized on the canonical ROI JSON)."""
+        return geometry_from_json(roi_key(roi_coords))
 
     def _validate_dates(self, start_date: str, end_date: str):
         """Validate dates."""
@@ -65,142 +95,163 @@ class TundraAPI:
                       resolution: int = 250) -> Dict[str, Any]:
         """
         Main tundra analysis with adaptive global thresholds.
+        Results are memoized per (ROI, dates, resolution); failed analyses are not cached.
         """
         try:
             start_date, end_date = self._validate_dates(start_date, end_date)
-            roi = self._create_geometry(roi_coords)
-            area_km2 = roi.area().divide(1e6).getInfo()
-            
-            # Get adaptive parameters based on ROI location
-            roi_center = roi.centroid().coordinates().getInfo()
-            adaptive_params = self._get_adaptive_parameters(roi_center[1])  # latitude
-            
-            # Get data layers
-            data_layers = self._get_data_layers(roi, start_date, end_date)
-            
-            # Create classification with adaptive parameters
-            classification_image = self._create_adaptive_classification(
-                data_layers, roi, adaptive_params
-            )
-            
-            # Calculate statistics
-            statistics = self._calculate_statistics(
-                data_layers, classification_image, area_km2, roi, adaptive_params
-            )
-            
-            return {
-                "status": "success",
-                "classification_image": classification_image,
-                "statistics": statistics
-            }
+            return self._run_tundra_analysis(roi_key(roi_coords), start_date, end_date, resolution)
             
         except Exception as e:
+            logger.error("Tundra analysis failed: %s", e)
             return {
                 "status": "error",
                 "error": str(e),
                 "message": "Tundra analysis failed"
             }
 
-    def _get_adaptive_parameters(self, latitude: float) -> Dict[str, float]:
-        """Calculate adaptive parameters based on geographic location."""
-        abs_lat = abs(latitude)
+    @analysis_cache(maxsize=64)
+    def _run_tundra_analysis(self, roi_json: str, start_date: str, end_date: str,
+                             resolution: int) -> Dict[str, Any]:
+        """Run the tundra analysis for a canonicalized ROI key."""
+        roi = geometry_from_json(roi_json)
+        
+        # Get data layers (server-side only); catalog lookups only need a coarse footprint
+        data_layers = self._get_data_layers(
+            roi, start_date, end_date, filter_roi=roi.simplify(maxError=resolution * 2)
+        )
         
-        # Adaptive alpine elevation (higher at lower latitudes)
-        alpine_elevation = self.base_alpine_elevation + max(0, (45 - abs_lat) * 50)
+        # Create classification with adaptive parameters derived from the ROI centroid on the server
+        adaptive_params = self._get_adaptive_parameters(roi.centroid().coordinates().get(1))
+        classification_image = self._create_adaptive_classification(data_layers, roi, adaptive_params)
         
-        # Adaptive permafrost probability (higher at higher latitudes)
-        permafrost_boost = max(0, (abs_lat - 50) / 40)  # 0 at 50°, 1 at 90°
+        # ROI area, applied adaptive parameters, layer means and class areas in a single round trip
+        summary = ee.Dictionary({
+            'area_km2': roi.area().divide(1e6),
+            'adaptive_params': ee.Dictionary(adaptive_params),
+            **data_layers['summary']
+        }).combine(self._class_area_sums(classification_image, roi))
+        info = call_with_retry(summary.getInfo)
+        area_km2 = info['area_km2']
+        data_layers.update(self._summarize_layers(info))
         
-        # Adaptive temperature threshold (colder required at lower latitudes)
-        temp_threshold = self.lst_threshold - max(0, (60 - abs_lat) * 0.1)
+        # Calculate statistics (reporting the thresholds the classification actually used)
+        statistics = self._calculate_statistics(
+            data_layers, info, area_km2, info['adaptive_params']
+        )
         
         return {
-            'alpine_elevation': alpine_elevation,
+            "status": "success",
+            "classification_image": classification_image,
+            "statistics": statistics
+        }
+
+    def _get_adaptive_parameters(self, latitude) -> Dict[str, ee.Number]:
+        """
+        Calculate adaptive parameters from the (server-side) ROI latitude, so the
+        classification needs no round trip; the values are fetched with the analysis summary.
+        """
+        abs_lat = ee.Number(latitude).abs()
+        
+        # Adaptive permafrost probability (higher at higher latitudes): 0 at 50°, 1 at 90°
+        permafrost_boost = abs_lat.subtract(50).divide(40).max(0)
+        return {
+            # Adaptive alpine elevation (higher at lower latitudes)
+            'alpine_elevation': ee.Number(45).subtract(abs_lat).multiply(50).max(0).add(self.base_alpine_elevation),
             'permafrost_boost': permafrost_boost,
-            'temperature_threshold': temp_threshold,
+            # Adaptive temperature threshold (colder required at lower latitudes)
+            'temperature_threshold': ee.Number(self.lst_threshold).subtract(
+                ee.Number(60).subtract(abs_lat).multiply(0.1).max(0)
+            ),
+            'permafrost_threshold': ee.Number(self.permafrost_threshold).subtract(permafrost_boost.multiply(0.15)).max(0.1),
             'latitude': abs_lat
         }
 
-    def _get_data_layers(self, roi, start_date: str, end_date: str) -> Dict[str, Any]:
-        """Get all required data layers efficiently."""
-        try:
-            # Vegetation (NDVI)
-            try:
-                s2 = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
-                    .filterBounds(roi).filterDate(start_date, end_date) \
-                    .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 30)) \
-                    .median()
-                ndvi = s2.normalizedDifference(['B8', 'B4']).clip(roi)
-                ndwi = s2.normalizedDifference(['B3', 'B8']).clip(roi)
-                ndvi_mean = ndvi.reduceRegion(ee.Reducer.mean(), roi, 250, 1e9).get('nd').getInfo() or 0.15
-                ndwi_mean = ndwi.reduceRegion(ee.Reducer.mean(), roi, 250, 1e9).get('nd').getInfo() or -0.1
-                vegetation_available = True
-            except:
-                ndvi = ee.Image.constant(0.15).clip(roi)
-                ndwi = ee.Image.constant(-0.1).clip(roi)
-                ndvi_mean, ndwi_mean = 0.15, -0.1
-                vegetation_available = False
+    def _get_data_layers(self, roi, start_date: str, end_date: str, filter_roi=None) -> Dict[str, Any]:
+        """
+        Build all data layers and their ROI means as server-side objects (no getInfo()).
+        Missing data falls back to constants or a latitude-based estimate on the server.
+        filter_roi (e.g. a simplified ROI) is used for filterBounds only; clipping and
+        reductions always use the exact roi.
+        """
+        if filter_roi is None:
+            filter_roi = roi
 
-            # Temperature (LST)
-            try:
-                lst = ee.ImageCollection('MODIS/061/MOD11A1') \
-                    .filterBounds(roi).filterDate(start_date, end_date) \
-                    .select('LST_Day_1km').median() \
-                    .multiply(0.02).subtract(273.15).clip(roi)
-                lst_mean = lst.reduceRegion(ee.Reducer.mean(), roi, 1000, 1e9).get('LST_Day_1km').getInfo()
-                if lst_mean is None:
-                    raise Exception("No LST data")
-                temperature_available = True
-            except:
-                # Estimate temperature based on latitude
-                coords = ee.Image.pixelLonLat().clip(roi)
-                lat = coords.select('latitude')
-                lst = lat.multiply(-0.7).add(15).clip(roi)  # Rough temp estimate
-                lst_mean = lst.reduceRegion(ee.Reducer.mean(), roi, 1000, 1e9).get('latitude').getInfo() or 5.0
-                temperature_available = False
+        # Vegetation (NDVI/NDWI); constants when there are no scenes
+        s2_collection = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
+            .filter(ee.Filter.And(
+                ee.Filter.bounds(filter_roi),
+                ee.Filter.date(start_date, end_date),
+                ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 30)
+            )) \
+            .select(['B3', 'B4', 'B8'])
+        s2_count = s2_collection.size()
+        s2 = s2_collection.median()
+        ndvi = ee.Image(ee.Algorithms.If(
+            s2_count.gt(0), s2.normalizedDifference(['B8', 'B4']), ee.Image.constant(0.15).rename('nd')
+        )).clip(roi)
+        ndwi = ee.Image(ee.Algorithms.If(
+            s2_count.gt(0), s2.normalizedDifference(['B3', 'B8']), ee.Image.constant(-0.1).rename('nd')
+        )).clip(roi)
 
-            # Elevation
-            try:
-                elevation = ee.Image('USGS/SRTMGL1_003').clip(roi)
-                elev_mean = elevation.reduceRegion(ee.Reducer.mean(), roi, 90, 1e9).get('elevation').getInfo() or 500
-                elevation_available = True
-            except:
-                elevation = ee.Image.constant(500).clip(roi)
-                elev_mean = 500
-                elevation_available = False
+        # Temperature (LST); latitude-based estimate when MODIS has no valid pixels over the ROI
+        lst_collection = ee.ImageCollection('MODIS/061/MOD11A1') \
+            .filter(ee.Filter.And(ee.Filter.bounds(filter_roi), ee.Filter.date(start_date, end_date))) \
+            .select('LST_Day_1km')
+        modis_lst = ee.Image(ee.Algorithms.If(
+            lst_collection.size().gt(0), lst_collection.median(), ee.Image().rename('LST_Day_1km')
+        )).multiply(0.02).subtract(273.15).clip(roi)
+        # Latitude grid, shared by the LST estimate, the permafrost index and the classification
+        lat = ee.Image.pixelLonLat().select('latitude').clip(roi)
+        lat_abs = lat.abs()
+        estimated_lst = lat.multiply(-0.7).add(15)  # Rough temp estimate
 
-            # Permafrost index (latitude-based)
-            coords = ee.Image.pixelLonLat().clip(roi)
-            lat = coords.select('latitude')
-            permafrost_index = lat.abs().subtract(40).divide(30).clamp(0, 1)
-            permafrost_mean = permafrost_index.reduceRegion(ee.Reducer.mean(), roi, 1000, 1e9).get('latitude').getInfo() or 0.3
+        # Elevation
+        elevation = ee.Image('USGS/SRTMGL1_003').clip(roi)
 
-            return {
-                'ndvi': ndvi, 'ndvi_mean': round(ndvi_mean, 3),
-                'ndwi': ndwi, 'ndwi_mean': round(ndwi_mean, 3),
-                'lst': lst, 'lst_mean': round(lst_mean, 2),
-                'elevation': elevation, 'elevation_mean': round(elev_mean, 1),
-                'permafrost': permafrost_index, 'permafrost_mean': round(permafrost_mean, 3),
-                'data_quality': {
-                    'vegetation': vegetation_available,
-                    'temperature': temperature_available,
-                    'elevation': elevation_available
-                }
+        # Permafrost index (latitude-based)
+        permafrost_index = lat_abs.subtract(40).divide(30).clamp(0, 1)
+
+        # All layer means in one pass over the ROI (each band keeps its own mask)
+        stack = ndvi.rename('ndvi').addBands([
+            ndwi.rename('ndwi'), modis_lst.rename('lst'), estimated_lst.rename('lst_est'),
+            elevation.rename('elev'), permafrost_index.rename('pf')
+        ])
+        means = stack.reduceRegion(
+            reducer=ee.Reducer.mean(), geometry=roi, scale=250, maxPixels=1e9, tileScale=4
+        )
+        temperature_available = ee.Number(ee.Algorithms.If(ee.Algorithms.IsEqual(means.get('lst'), None), 0, 1))
+        lst = ee.Image(ee.Algorithms.If(temperature_available, modis_lst, estimated_lst))
+        lst_mean = ee.Algorithms.If(temperature_available, means.get('lst'), means.get('lst_est'))
+
+        return {
+            'ndvi': ndvi, 'ndwi': ndwi, 'lst': lst, 'elevation': elevation, 'permafrost': permafrost_index,
+            'lat_abs': lat_abs,
+            # Fetched by analyze_tundra together with the ROI area and centroid
+            'summary': {
+                'ndvi_mean': means.get('ndvi'),
+                'ndwi_mean': means.get('ndwi'),
+                'lst_mean': lst_mean,
+                'elev_mean': means.get('elev'),
+                'permafrost_mean': means.get('pf'),
+                's2_count': s2_count,
+                'temperature_available': temperature_available
             }
-            
-        except Exception as e:
-            # Ultimate fallback
-            roi_center = roi.centroid().coordinates().getInfo()
-            lat = abs(roi_center[1])
-            
-            return {
-                'ndvi': ee.Image.constant(0.15).clip(roi), 'ndvi_mean': 0.15,
-                'ndwi': ee.Image.constant(-0.1).clip(roi), 'ndwi_mean': -0.1,
-                'lst': ee.Image.constant(max(-5, 15 - lat * 0.3)).clip(roi), 'lst_mean': max(-5, 15 - lat * 0.3),
-                'elevation': ee.Image.constant(500).clip(roi), 'elevation_mean': 500,
-                'permafrost': ee.Image.constant(max(0.1, (lat - 40) / 30)).clip(roi), 'permafrost_mean': max(0.1, (lat - 40) / 30),
-                'data_quality': {'vegetation': False, 'temperature': False, 'elevation': False}
+        }
+
+    def _summarize_layers(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Layer means and data quality from the fetched summary, with the usual defaults."""
+        return {
+            'ndvi_mean': round(info.get('ndvi_mean') or 0.15, 3),
+            'ndwi_mean': round(info.get('ndwi_mean') or -0.1, 3),
+            'lst_mean': round(info.get('lst_mean') or 5.0, 2),
+            'elevation_mean': round(info.get('elev_mean') or 500, 1),
+            'permafrost_mean': round(info.get('permafrost_mean') or 0.3, 3),
+            'data_quality': {
+                'vegetation': bool(info['s2_count']),
+                'temperature': bool(info['temperature_available']),
+                'elevation': True
             }
+        }
 
     def _create_adaptive_classification(self, data_layers: Dict, roi, adaptive_params: Dict) -> ee.Image:
         """Create 5-class classification with adaptive parameters."""
@@ -219,34 +270,18 @@ class TundraAPI:
             is_wet = ndwi.gt(self.ndwi_threshold)
             
             # Enhanced permafrost detection
-            permafrost_threshold = max(0.1, self.permafrost_threshold - adaptive_params['permafrost_boost'] * 0.15)
-            is_permafrost = permafrost.gt(permafrost_threshold)
+            is_permafrost = permafrost.gt(adaptive_params['permafrost_threshold'])
             
             # High latitude boost (for Arctic regions)
-            coords = ee.Image.pixelLonLat().clip(roi)
-            lat = coords.select('latitude')
-            is_arctic_latitude = lat.abs().gt(60)
+            is_arctic_latitude = data_layers['lat_abs'].gt(60)
             
-            # Classification hierarchy
-            classification = ee.Image(0)  # Default: No Tundra
-            
-            # Class 1: Arctic Tundra (cold + permafrost/high latitude + vegetation)
-            arctic_conditions = (is_permafrost.Or(is_arctic_latitude)).And(is_cold).And(is_tundra_vegetation)
-            classification = classification.where(arctic_conditions.And(is_alpine.Not()), 1)
-            
-            # Class 2: Alpine Tundra (high elevation + vegetation)
-            alpine_conditions = is_alpine.And(is_tundra_vegetation)
-            classification = classification.where(alpine_conditions, 2)
-            
-            # Class 3: Wet Tundra (permafrost/arctic + wet + vegetation)
-            wet_conditions = (is_permafrost.Or(is_arctic_latitude)).And(is_wet).And(is_tundra_vegetation).And(is_alpine.Not())
-            classification = classification.where(wet_conditions, 3)
-            
-            # Class 4: Shrub/Dry Tundra (permafrost/arctic + dry + vegetation)
-            dry_conditions = (is_permafrost.Or(is_arctic_latitude)).And(is_wet.Not()).And(is_tundra_vegetation).And(is_alpine.Not())
-            # Exclude areas already classified as arctic tundra
-            dry_conditions = dry_conditions.And(arctic_conditions.Not())
-            classification = classification.where(dry_conditions, 4)
+            # Pack the conditions into one code per pixel (base 3: 0 = false, 1 = true, 2 = masked)
+            # and classify with a single table lookup instead of a where() cascade
+            conditions = [is_tundra_vegetation, is_cold, is_alpine, is_wet, is_permafrost.Or(is_arctic_latitude)]
+            code = ee.Image(0)
+            for digit, condition in enumerate(conditions):
+                code = code.add(condition.unmask(2).multiply(3 ** digit))
+            classification = code.remap(_CLASSIFY_FROM, _CLASSIFY_TO, 0)
             
             return classification.rename('tundra_class').clip(roi)
             
@@ -257,40 +292,41 @@ class TundraAPI:
             simple_tundra = lat.gt(55).multiply(1)  # Basic Arctic detection
             return simple_tundra.rename('tundra_class').clip(roi)
 
-    def _calculate_statistics(self, data_layers: Dict, classification: ee.Image, 
-                            area_km2: float, roi, adaptive_params: Dict) -> Dict[str, Any]:
+    def _class_area_sums(self, classification: ee.Image, roi) -> ee.Dictionary:
+        """
+        Area (km²) of each class as bands c0-c4, summed in one reduction, plus the
+        dominant tundra type (server-side; ties go to the first type listed).
+        """
+        pixel_area = ee.Image.pixelArea().divide(1e6)
+        masks = ee.Image.cat([classification.eq(i).multiply(pixel_area).rename(f'c{i}') for i in range(5)])
+        sums = masks.reduceRegion(
+            reducer=ee.Reducer.sum(), geometry=roi, scale=250, maxPixels=1e13, tileScale=4
+        )
+        
+        # Determine dominant type
+        tundra_types = ee.List(['Arctic Tundra', 'Alpine Tundra', 'Wet Tundra', 'Shrub/Dry Tundra'])
+        tundra_areas = ee.List([sums.get('c1'), sums.get('c2'), sums.get('c3'), sums.get('c4')])
+        dominant_type = ee.Algorithms.If(
+            ee.Number(tundra_areas.reduce(ee.Reducer.sum())).gt(0),
+            tundra_types.get(ee.Array(tundra_areas).argmax().get(0)),
+            'No Tundra'
+        )
+        return sums.set('dominant_type', dominant_type)
+
+    def _calculate_statistics(self, data_layers: Dict, info: Dict[str, Any], 
+                            area_km2: float, adaptive_params: Dict) -> Dict[str, Any]:
         """Calculate comprehensive statistics."""
         try:
-            # Calculate class areas
-            pixel_area = ee.Image.pixelArea().divide(1e6)
-            areas = pixel_area.addBands(classification).reduceRegion(
-                reducer=ee.Reducer.sum().group(groupField=1, groupName='class'),
-                geometry=roi, scale=250, maxPixels=1e11
-            ).get('groups')
-            
-            # Process areas
-            area_list = ee.List(areas).getInfo() if areas else []
-            class_areas = {item['class']: item['sum'] for item in area_list} if area_list else {}
-            
-            # Extract areas
-            no_tundra = class_areas.get(0, 0)
-            arctic_tundra = class_areas.get(1, 0)
-            alpine_tundra = class_areas.get(2, 0)
-            wet_tundra = class_areas.get(3, 0)
-            dry_tundra = class_areas.get(4, 0)
+            # Class areas (fetched with the analysis summary)
+            no_tundra = info['c0']
+            arctic_tundra = info['c1']
+            alpine_tundra = info['c2']
+            wet_tundra = info['c3']
+            dry_tundra = info['c4']
             
             total_tundra = arctic_tundra + alpine_tundra + wet_tundra + dry_tundra
             tundra_percent = (total_tundra / area_km2) * 100 if area_km2 > 0 else 0
             
-            # Determine dominant type
-            tundra_types = {
-                'Arctic Tundra': arctic_tundra,
-                'Alpine Tundra': alpine_tundra,
-                'Wet Tundra': wet_tundra,
-                'Shrub/Dry Tundra': dry_tundra
-            }
-            dominant_type = max(tundra_types, key=tundra_types.get) if total_tundra > 0 else "No Tundra"
-            
             # Climate indicators
             permafrost_extent = arctic_tundra + wet_tundra + dry_tundra
             thaw_zones = dry_tundra
@@ -299,7 +335,7 @@ class TundraAPI:
                 "roi_area_km2": round(area_km2, 2),
                 "total_tundra_area_km2": round(total_tundra, 2),
                 "tundra_coverage_percent": round(tundra_percent, 1),
-                "dominant_tundra_type": dominant_type,
+                "dominant_tundra_type": info['dominant_type'],
                 "class_areas_km2": {
                     "no_tundra": round(no_tundra, 2),
                     "arctic_tundra": round(arctic_tundra, 2),
@@ -348,16 +384,12 @@ class TundraAPI:
     def create_tundra_classification_image(self, roi_coords: Union[List, dict], 
                                          start_date: str, end_date: str, resolution: int = 250) -> ee.Image:
         """Create classification image for visualization."""
-        try:
-            result = self.analyze_tundra(roi_coords, start_date, end_date, resolution)
-            if result["status"] == "success":
-                return result["classification_image"]
-            else:
-                roi = self._create_geometry(roi_coords)
-                return ee.Image.constant(0).clip(roi).rename('tundra_class')
-        except:
-            roi = self._create_geometry(roi_coords)
-            return ee.Image.constant(0).clip(roi).rename('tundra_class')
+        # analyze_tundra reports failures in its result rather than raising
+        result = self.analyze_tundra(roi_coords, start_date, end_date, resolution)
+        if result["status"] == "success":
+            return result["classification_image"]
+        roi = self._create_geometry(roi_coords)
+        return ee.Image.constant(0).clip(roi).rename('tundra_class')
 
     def get_tundra_statistics(self, roi_coords: Union[List, dict], 
                             start_date: str, end_date: str, resolution: int = 250) -> Dict[str, Any]:
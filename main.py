@@ -1,6 +1,7 @@
 # main.py - Open Source Environmental Analysis Dashboard (No Authentication)
 
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
@@ -34,6 +35,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# High-volume endpoint: higher concurrent-request ceiling for the parallel probing/tiling paths
+EE_HIGH_VOLUME_URL = 'https://earthengine-highvolume.googleapis.com'
+
 # Initialize Earth Engine
 def initialize_earth_engine():
     try:
@@ -45,12 +49,18 @@ def initialize_earth_engine():
                 credentials_info['client_email'],
                 key_data=credentials_json
             )
-            ee.Initialize(credentials)
+            init_kwargs = {'credentials': credentials}
         else:
             # Fallback to default initialization
-            ee.Initialize(project=os.environ.get('EE_PROJECT', 'ee-deepeshy'))
+            init_kwargs = {'project': os.environ.get('EE_PROJECT', 'ee-deepeshy')}
         
-        logger.info("Earth Engine initialized successfully")
+        try:
+            ee.Initialize(opt_url=EE_HIGH_VOLUME_URL, **init_kwargs)
+            logger.info("Earth Engine initialized successfully (high-volume endpoint)")
+        except Exception as e:
+            logger.warning(f"High-volume endpoint initialization failed: {e}. Using standard endpoint")
+            ee.Initialize(**init_kwargs)
+            logger.info("Earth Engine initialized successfully")
     except Exception as e:
         logger.error(f"Earth Engine initialization failed: {e}")
 
@@ -243,9 +253,12 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
         resolution = layer_request.resolution or 10
 
         logger.info(f"Analyzing {layer_type} layer...")
+        # Analyses make blocking Earth Engine calls, so they run on worker threads
+        # to keep the event loop serving other requests
 
         if layer_type == "forest":
-            forest_result = forest_api.classify_forest_and_estimate_biomass(
+            forest_result = await run_in_threadpool(
+                forest_api.classify_forest_and_estimate_biomass,
                 coordinates, layer_request.start_date, layer_request.end_date, resolution
             )
             if forest_result["status"] == "success":
@@ -264,7 +277,8 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
                 )
 
         elif layer_type == "wetland":
-            wetland_result = wetland_api.analyze_wetland(
+            wetland_result = await run_in_threadpool(
+                wetland_api.analyze_wetland,
                 coordinates, layer_request.start_date, layer_request.end_date, resolution
             )
             if wetland_result["status"] == "success":
@@ -283,7 +297,8 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
                 )
 
         elif layer_type == "tundra":
-            tundra_result = tundra_api.analyze_tundra(
+            tundra_result = await run_in_threadpool(
+                tundra_api.analyze_tundra,
                 coordinates, layer_request.start_date, layer_request.end_date, 250
             )
             if tundra_result["status"] == "success":
@@ -302,7 +317,8 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
                 )
 
         elif layer_type == "grassland":
-            grassland_result = grassland_api.analyze_grassland(
+            grassland_result = await run_in_threadpool(
+                grassland_api.analyze_grassland,
                 coordinates, layer_request.start_date, layer_request.end_date, resolution
             )
             if grassland_result["status"] == "success":
@@ -321,7 +337,7 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
                 )
 
         elif layer_type == "algal_blooms":
-            algal_result = algal_blooms_api.detect_algal_bloom(
+            algal_result = await algal_blooms_api.adetect_algal_bloom(
                 coordinates, layer_request.start_date, layer_request.end_date, 300
             )
             if algal_result["status"] == "success":
@@ -340,7 +356,8 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
                 )
 
         elif layer_type == "soil":
-            soil_result = soil_api.analyze_soil_moisture(
+            soil_result = await run_in_threadpool(
+                soil_api.analyze_soil_moisture,
                 coordinates, layer_request.start_date, layer_request.end_date, 500
             )
             if soil_result["status"] == "success":
@@ -359,7 +376,8 @@ async def analyze_layer(layer_request: LayerAnalysisRequest):
                 )
 
         elif layer_type == "chlorophyll":
-            chlorophyll_result = ocean_api.analyze_chlorophyll(
+            chlorophyll_result = await run_in_threadpool(
+                ocean_api.analyze_chlorophyll,
                 coordinates, layer_request.start_date, layer_request.end_date, 4638
             )
             if chlorophyll_result["status"] == "success":